@@ -1,13 +1,21 @@
+import argparse
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from research_agent_stub import generate_digestible_output
+from research_agent_stub import generate_digestible_output, generate_digestible_outputs
 from web_search_agent import web_search_summary
 from evaluator_agent import evaluate_summary
-from distribution_agent import distribute_summary
+from distribution_agent import distribute_summaries
+from hedged_research import HEDGE_DELAY, MissHistory, hedged_lookup
+import metrics
+import run_log
 
 TOPICS_FILE = Path("autonomous_topics.json")
-LOG_FILE = Path("autonomous_log.json")
+LOG_DIR = run_log.LOG_DIR
+DEFAULT_WORKERS = 4
+DISTRIBUTION_BATCH = 50  # topics routed per section/inbox file rewrite
 
 # Load or create topic list
 def load_topics():
@@ -26,56 +34,153 @@ def load_topics():
             topics = json.load(f).get("topics", [])
     return topics
 
-# Load or create the autonomous log
+# Full run history as a list of dicts (compatibility view over the JSONL segments)
 def load_log():
-    if LOG_FILE.exists():
-        with open(LOG_FILE, "r") as f:
-            return json.load(f)
-    return []
+    return run_log.read_log(LOG_DIR)
 
-def save_log(log):
-    with open(LOG_FILE, "w") as f:
-        json.dump(log, f, indent=2)
+def research_topic(topic, level, prefetched=None, hedge_delay=None, history=None):
+    """Run the network-bound stages for one topic: fetch, fallback and evaluation.
 
-def autonomous_run():
-    topics = load_topics()
-    log = load_log()
-    print(f"\n[🤖] Starting autonomous agent... ({len(topics)} topics)\n")
+    With ``hedge_delay`` set, Wikipedia and the web search are raced (see
+    hedged_research) instead of running one after the other.
+    """
+    print(f"\n🔍 Topic: {topic}")
 
-    for topic in topics:
-        print(f"\n🔍 Topic: {topic}")
-        level = "novice"  # Default for now; can be expanded to read user profiles
-
-        # Step 1: Try Wikipedia first
+    # Step 1: Try Wikipedia first (already fetched if the batch query resolved it)
+    metrics.inc("research_requests_total", path="autonomous")
+    if prefetched:
+        summary_data = prefetched
+    elif hedge_delay is not None:
+        summary_data = hedged_lookup(topic, level, hedge_delay, history)
+    else:
         summary_data = generate_digestible_output(topic, level)
 
-        if not summary_data.get("summary") or "no summary" in summary_data["summary"].lower():
-            print("⚠️ Wikipedia summary not found, using web search fallback.")
-            summary_data = web_search_summary(topic, level)
+    if not summary_data.get("summary") or "no summary" in summary_data["summary"].lower():
+        print(f"⚠️ Wikipedia summary not found for '{topic}', using web search fallback.")
+        metrics.inc("fallbacks_total", path="autonomous")
+        summary_data = web_search_summary(topic, level)
+
+    if not summary_data.get("summary"):
+        return None
+
+    # Step 2: Evaluate
+    scores = evaluate_summary({"summary": summary_data["summary"], "level": level})
+    return summary_data, scores
+
+def autonomous_run(workers=DEFAULT_WORKERS, topics=None, progress=None, cancel_event=None, hedge_delay=None):
+    """Research, evaluate, distribute and log every topic.
+
+    ``topics`` defaults to the topic file. ``progress(topic, status, info)`` is
+    called once per topic with status "done", "skipped", "failed" or
+    "cancelled". Setting ``cancel_event`` stops the run before the next topic
+    starts. ``hedge_delay`` (seconds) turns on hedged lookups for topics the
+    batch query could not resolve. Returns the count of topics per status.
+    """
+    topics = load_topics() if topics is None else list(topics)
+    workers = max(1, int(workers))
+    print(f"\n[🤖] Starting autonomous agent... ({len(topics)} topics, {workers} workers)\n")
+
+    level = "novice"  # Default for now; can be expanded to read user profiles
+    counts = {"done": 0, "skipped": 0, "failed": 0, "cancelled": 0}
 
-        if not summary_data.get("summary"):
-            print("❌ Skipping. No content available for this topic.")
-            continue
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
 
-        # Step 2: Evaluate
-        scores = evaluate_summary(topic, summary_data["summary"], level)
+    def report(topic, status, **info):
+        counts[status] += 1
+        metrics.inc("topics_total", status=status)
+        if progress is not None:
+            progress(topic, status, info)
 
-        # Step 3: Distribute
-        distribute_summary(topic, summary_data["summary"], level)
+    before = metrics.snapshot()
+    run_started = time.perf_counter()
 
-        # Step 4: Log
-        log_entry = {
-            "topic": topic,
-            "level": level,
-            "timestamp": datetime.now().isoformat(),
-            "source": summary_data.get("source", "unknown"),
-            "clarity_score": scores.get("clarity"),
-            "tone_score": scores.get("tone"),
-        }
-        log.append(log_entry)
-        save_log(log)
+    # Resolve as many topics as possible with batched queries; the rest take the
+    # single-title path (and web search fallback) inside the workers.
+    prefetched = generate_digestible_outputs(topics, level, fallback=False) if topics and not cancelled() else {}
+    history = MissHistory() if hedge_delay is not None else None
+    if history is not None:
+        for topic in prefetched:
+            history.record(topic, missed=False)
 
-    print("\n✅ Autonomous agent run complete.\n")
+    def run_one(topic):
+        if cancelled():
+            return "cancelled", None, 0.0
+        started = time.perf_counter()
+        try:
+            with metrics.timer("research_topic"):
+                result = research_topic(topic, level, prefetched.get(topic), hedge_delay, history)
+        except Exception as e:
+            return "failed", e, time.perf_counter() - started
+        return ("done" if result else "skipped"), result, time.perf_counter() - started
+
+    pending = []      # distribution items written in batches
+    pending_log = []  # their log entries, appended once the batch is distributed
+    with ThreadPoolExecutor(max_workers=workers) as pool, run_log.RunLogWriter(LOG_DIR) as log:
+        results = pool.map(run_one, topics)
+
+        def flush_batch():
+            # Log only after distribution returns, so an interrupted run never
+            # logs a topic whose section and inbox entries were not written
+            distribute_summaries(pending)
+            with metrics.timer("log_write"):
+                for log_entry in pending_log:
+                    log.append(log_entry)
+            pending.clear()
+            pending_log.clear()
+
+        # map() yields in topic order, so distribution and log writes stay on this
+        # thread and the log order matches the topic file regardless of worker count.
+        try:
+            for topic, (status, result, seconds) in zip(topics, results):
+                if status == "cancelled":
+                    report(topic, status)
+                    continue
+                if status == "failed":
+                    print(f"❌ Failed '{topic}': {result}")
+                    report(topic, status, seconds=round(seconds, 3), error=str(result))
+                    continue
+                if result is None:
+                    print(f"❌ Skipping '{topic}'. No content available for this topic.")
+                    report(topic, "skipped", seconds=round(seconds, 3))
+                    continue
+                summary_data, scores = result
+
+                # Step 3: Distribute and Step 4: Log (buffered, written every DISTRIBUTION_BATCH topics)
+                pending.append((topic, summary_data["summary"], level))
+                pending_log.append({
+                    "topic": topic,
+                    "level": level,
+                    "timestamp": datetime.now().isoformat(),
+                    "source": summary_data.get("source", "unknown"),
+                    "clarity_score": scores.get("Clarity Score"),
+                    "tone_score": scores.get("Tone Fit Score"),
+                })
+                if len(pending) >= DISTRIBUTION_BATCH:
+                    flush_batch()
+                report(topic, "done", seconds=round(seconds, 3), source=summary_data.get("source", "unknown"))
+        finally:
+            flush_batch()
+            if history is not None:
+                history.save()
+            # Per-run totals are kept in the run's summary record in the log
+            summary = {"topics": counts, "seconds": round(time.perf_counter() - run_started, 3)}
+            if metrics.enabled():
+                summary.update(metrics.summarize(before))
+            log.close(summary)
+
+    if cancelled():
+        print("\n🛑 Autonomous agent run cancelled.\n")
+    else:
+        print("\n✅ Autonomous agent run complete.\n")
+    return counts
 
 if __name__ == "__main__":
-    autonomous_run()
+    parser = argparse.ArgumentParser(description="Run the autonomous research pipeline.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Number of topics researched concurrently (1 = sequential).")
+    parser.add_argument("--hedge", nargs="?", type=float, const=HEDGE_DELAY, default=None, metavar="SECONDS",
+                        help="Race the web search against Wikipedia, starting it after SECONDS "
+                             f"(default {HEDGE_DELAY}) or at once for topics that keep missing.")
+    args = parser.parse_args()
+    autonomous_run(workers=args.workers, hedge_delay=args.hedge)
@@ -0,0 +1,128 @@
+# benchmarks/bench_ddg_extract.py
+# DuckDuckGo result extraction: full BeautifulSoup parse vs the early-stopping streaming extractor
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+import ddg_extractor  # noqa: E402
+
+RESULT_TEMPLATE = """
+<div class="result results_links results_links_deep web-result ">
+  <div class="links_main links_deep result__body">
+    <h2 class="result__title">
+      <a rel="nofollow" class="result__a" href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample{i}.org%2Fwiki%2F{slug}&amp;rut=abc{i}">
+        <b>{topic}</b> - Explanation &amp; overview, part {i}</a>
+    </h2>
+    <div class="result__extras">
+      <div class="result__extras__url">
+        <span class="result__icon"><a rel="nofollow" href="//example{i}.org/"><img class="result__icon__img" width="16" height="16" alt="" src="//external-content.duckduckgo.com/ip3/example{i}.org.ico" name="i15" /></a></span>
+        <a class="result__url" href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample{i}.org">example{i}.org/wiki/{slug}</a>
+      </div>
+    </div>
+    <a class="result__snippet" href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample{i}.org%2Fwiki%2F{slug}">An <b>{topic}</b> is described here in plain terms. Result {i} covers the history, the main ideas and common uses of <b>{topic}</b>, with links to further reading &#8212; updated regularly.</a>
+    <div class="clear"></div>
+  </div>
+</div>
+"""
+
+
+def synthetic_page(topic="Quantum computing", results=30):
+    """A results page with the structure of html.duckduckgo.com (header, form, results, footer)."""
+    slug = topic.replace(" ", "_")
+    header = (
+        "<!DOCTYPE html><html><head><meta charset=\"UTF-8\"><title>" + topic + " at DuckDuckGo</title>"
+        + "<style>" + ".result{margin:0 0 1em 0}" * 200 + "</style></head><body class=\"body--html\">"
+        + "<div class=\"header\"><form action=\"/html/\" method=\"post\"><input type=\"text\" name=\"q\" value=\""
+        + topic + "\"><input type=\"submit\" value=\"S\"></form>"
+        + "".join(f"<a class=\"filter\" href=\"/html/?q=x&amp;df={d}\">{d}</a>" for d in "dwmy") + "</div>"
+        + "<div id=\"links\" class=\"results\">"
+    )
+    body = "".join(RESULT_TEMPLATE.format(i=i, topic=topic, slug=slug) for i in range(results))
+    footer = "<div class=\"nav-link\"><form action=\"/html/\" method=\"post\"><input type=\"submit\" value=\"Next\"></form></div></div></body></html>"
+    return header + body + footer
+
+
+def bs4_extract(html, css_class, limit):
+    """The previous web_search_agent path: whole-page tree, then the first ``limit`` anchors."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    return [" ".join(a.get_text().split()) for a in soup.find_all("a", class_=css_class, limit=limit)]
+
+
+def chunked(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - started) * 1000)
+    return result, round(statistics.median(times), 3)
+
+
+def bench_page(name, html, repeat):
+    data = html.encode("utf-8")
+    rows = []
+    for css_class, limit in ((ddg_extractor.TITLE_CLASS, 3), (ddg_extractor.SNIPPET_CLASS, 5)):
+        expected, bs4_ms = timed(lambda: bs4_extract(html, css_class, limit), repeat)
+        text_result, text_ms = timed(lambda: ddg_extractor.extract(html, css_class, limit), repeat)
+
+        consumed = []
+
+        def streamed():
+            consumed.clear()
+            chunks = chunked(data, ddg_extractor.CHUNK_SIZE)
+            return ddg_extractor.extract((consumed.append(len(c)) or c for c in chunks), css_class, limit)
+
+        stream_result, stream_ms = timed(streamed, repeat)
+        rows.append({
+            "page": name,
+            "page_bytes": len(data),
+            "class": css_class,
+            "limit": limit,
+            "bs4_ms": bs4_ms,
+            "extract_ms": text_ms,
+            "stream_ms": stream_ms,
+            "stream_bytes_read": sum(consumed),
+            "speedup": round(bs4_ms / stream_ms, 1) if stream_ms else None,
+            "matches_bs4": text_result == expected and stream_result == expected,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare DuckDuckGo result extraction strategies.")
+    parser.add_argument("pages", nargs="*", help="Saved DuckDuckGo HTML result pages (default: synthetic pages).")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions per case.")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results to a JSON file.")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = [(Path(p).name, Path(p).read_text(encoding="utf-8", errors="replace")) for p in args.pages]
+    else:
+        pages = [(f"synthetic-{n}", synthetic_page(results=n)) for n in (10, 30, 100)]
+
+    rows = [row for name, html in pages for row in bench_page(name, html, args.repeat)]
+
+    print(f"{'page':<18}{'bytes':>9}  {'class':<16}{'bs4 ms':>9}{'extract':>9}{'stream':>9}{'read':>9}{'x':>7}  same")
+    for r in rows:
+        print(f"{r['page']:<18}{r['page_bytes']:>9}  {r['class']:<16}{r['bs4_ms']:>9}{r['extract_ms']:>9}"
+              f"{r['stream_ms']:>9}{r['stream_bytes_read']:>9}{r['speedup']:>7}  {r['matches_bs4']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# benchmarks/bench_pipeline.py
+# Offline benchmarks of the research pipeline against the local stub endpoints, with a JSON report
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(REPO_DIR))
+
+import autonomous_agent  # noqa: E402
+import distribution_agent  # noqa: E402
+import metrics  # noqa: E402
+import rate_limiter  # noqa: E402
+import research_agent_stub  # noqa: E402
+import response_cache  # noqa: E402
+import web_search_agent  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+LEVELS = ("novice", "intermediate", "advanced")
+
+
+def percentiles(values) -> dict:
+    """Summary of a list of latencies in ms (nearest-rank percentiles)."""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(rank(50), 3),
+        "p90_ms": round(rank(90), 3),
+        "p95_ms": round(rank(95), 3),
+        "p99_ms": round(rank(99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def make_topics(titles, count, miss_ratio, offset):
+    """``count`` distinct topic names; about ``miss_ratio`` of them are unknown to Wikipedia.
+
+    Known topics are numbered fixture titles ("Piston 1042"), which the stub
+    serves as the fixture but which never share a response cache entry.
+    """
+    topics = []
+    for i in range(count):
+        n = offset + i
+        if int((i + 1) * miss_ratio) > int(i * miss_ratio):
+            topics.append(f"Unknown topic {n}")
+        else:
+            topics.append(f"{titles[i % len(titles)]} {n}")
+    return topics
+
+
+@contextlib.contextmanager
+def scratch_dir():
+    """Run in a fresh working directory (memory, inbox, logs and caches are all cwd-relative)."""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        cache = response_cache.configure_cache(Path(workdir) / "http_cache.sqlite3")
+        try:
+            yield Path(workdir)
+        finally:
+            cache.close()
+            os.chdir(previous)
+
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_autonomous(server, titles, args):
+    rows = []
+    for workers in args.workers:
+        topics = make_topics(titles, args.topics, args.miss_ratio, offset=workers * 100000)
+        with scratch_dir():
+            server.reset_counts()
+            metrics.reset()
+            started = time.perf_counter()
+            with quiet(not args.verbose):
+                counts = autonomous_agent.autonomous_run(workers=workers, topics=topics, hedge_delay=args.hedge)
+            seconds = time.perf_counter() - started
+        rows.append({
+            "workers": workers,
+            "topics": len(topics),
+            "seconds": round(seconds, 3),
+            "topics_per_sec": round(len(topics) / seconds, 2),
+            "counts": counts,
+            "requests": dict(server.counts),
+        })
+    return rows
+
+
+def bench_research(server, titles, args):
+    topics = make_topics(titles, args.samples, args.miss_ratio, offset=0)
+    hits, misses = [], []
+    with scratch_dir():
+        server.reset_counts()
+        for i, topic in enumerate(topics):
+            started = time.perf_counter()
+            with quiet(not args.verbose):
+                output = research_agent_stub.generate_digestible_output(topic, LEVELS[i % len(LEVELS)])
+            elapsed = (time.perf_counter() - started) * 1000
+            (misses if "no summary" in output["summary"].lower() else hits).append(elapsed)
+    return {"all": percentiles(hits + misses), "found": percentiles(hits), "missing": percentiles(misses),
+            "requests": dict(server.counts)}
+
+
+def seed_distribution_files(workdir, titles, entries):
+    """Section and inbox files already holding ``entries`` distributed topics."""
+    items = [(f"{titles[i % len(titles)]} {i}", f"Summary text for item {i}. " * 8, LEVELS[i % len(LEVELS)])
+             for i in range(entries)]
+    sections, inbox = {}, {}
+    with quiet():
+        distribution_agent.apply_distribution(items, sections, inbox)
+    inbox_file, section_file = workdir / "internal_inbox.json", workdir / "section_outputs.json"
+    for path, data in ((inbox_file, inbox), (section_file, sections)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    return inbox_file.stat().st_size + section_file.stat().st_size
+
+
+def bench_distribute(titles, args):
+    rows = []
+    for entries in args.sizes:
+        with scratch_dir() as workdir:
+            size = seed_distribution_files(workdir, titles, entries)
+            times = []
+            for i in range(args.distribute_samples):
+                started = time.perf_counter()
+                with quiet():
+                    distribution_agent.distribute_summary(f"Piston sample {i}", "A short summary. " * 10, "novice")
+                times.append((time.perf_counter() - started) * 1000)
+        stats = percentiles(times)
+        rows.append({
+            "existing_entries": entries,
+            "file_bytes": size,
+            **stats,
+            "ms_per_mb": round(stats["p50_ms"] / (size / 1e6), 3) if size else None,
+        })
+    return rows
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research pipeline against local stub endpoints.")
+    parser.add_argument("--topics", type=int, default=60, help="Topics per autonomous run.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8], help="Worker counts to compare.")
+    parser.add_argument("--miss-ratio", type=float, default=0.2, help="Fraction of topics Wikipedia doesn't know.")
+    parser.add_argument("--hedge", type=float, default=None, metavar="SECONDS",
+                        help="Run autonomous benchmarks with hedged lookups.")
+    parser.add_argument("--samples", type=int, default=60, help="generate_digestible_output calls to time.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 5000, 20000],
+                        help="Existing distributed entries for the distribute_summary benchmark.")
+    parser.add_argument("--distribute-samples", type=int, default=10, help="distribute_summary calls per size.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub response latency (seconds).")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Extra random stub latency, up to (seconds).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub responses that are 500s.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of stub responses that are 429s.")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="Retry-After seconds sent with a 429.")
+    parser.add_argument("--host-rate", type=float, default=1000.0,
+                        help="Rate limit (req/s) for the stub host; the production host limits do not apply.")
+    parser.add_argument("--host-concurrency", type=int, default=64, help="Concurrency cap for the stub host.")
+    parser.add_argument("--only", choices=["autonomous", "research", "distribute"], nargs="+",
+                        help="Run only these benchmarks.")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for stub latency/error injection.")
+    parser.add_argument("--verbose", action="store_true", help="Show agent output.")
+    parser.add_argument("--json", metavar="FILE", help="Write the report to a JSON file.")
+    args = parser.parse_args()
+    selected = set(args.only or ["autonomous", "research", "distribute"])
+
+    server = StubServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        throttle_rate=args.throttle_rate, retry_after=args.retry_after, seed=args.seed)
+    titles = sorted(server.summaries)
+    research_agent_stub.WIKIPEDIA_URL = server.url
+    web_search_agent.DUCKDUCKGO_URL = server.url
+    rate_limiter.configure(server.netloc, rate=args.host_rate, burst=args.host_rate,
+                           concurrency=args.host_concurrency, max_concurrency=args.host_concurrency)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("json", "verbose")},
+    }
+    with server:
+        if "autonomous" in selected:
+            report["autonomous_run"] = bench_autonomous(server, titles, args)
+        if "research" in selected:
+            report["generate_digestible_output"] = bench_research(server, titles, args)
+    if "distribute" in selected:
+        report["distribute_summary"] = bench_distribute(titles, args)
+
+    for row in report.get("autonomous_run", []):
+        print(f"autonomous_run  workers={row['workers']:<3} {row['topics']} topics in {row['seconds']}s"
+              f"  -> {row['topics_per_sec']} topics/s  {row['counts']}")
+    for kind, stats in report.get("generate_digestible_output", {}).items():
+        if kind != "requests" and stats:
+            print(f"generate_digestible_output [{kind:<7}] n={stats['count']:<4} p50={stats['p50_ms']}ms"
+                  f"  p90={stats['p90_ms']}ms  p99={stats['p99_ms']}ms")
+    for row in report.get("distribute_summary", []):
+        print(f"distribute_summary  {row['existing_entries']:>6} entries ({row['file_bytes']:>10} bytes)"
+              f"  p50={row['p50_ms']}ms  p90={row['p90_ms']}ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[📝] Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
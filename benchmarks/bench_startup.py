@@ -0,0 +1,95 @@
+# benchmarks/bench_startup.py
+# Cold-import time of the API app and each agent, measured in fresh interpreters
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+MODULES = [
+    "main",
+    "autonomous_agent",
+    "research_agent_stub",
+    "web_search_agent",
+    "evaluator_agent",
+    "distribution_agent",
+    "content_generator_agent",
+    "document_reader_agent",
+    "orchestrator_agent",
+]
+
+# Prints the import time of one module and the heavy third-party packages it pulled in
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = sorted(m for m in ("numpy", "bs4", "PyPDF2", "docx", "textblob", "httpx", "requests", "fastapi")
+               if m in sys.modules)
+print("import-time", elapsed, ",".join(heavy))
+"""
+
+
+def measure(module, runs, workdir):
+    """Median and best import time (ms) over ``runs`` fresh interpreters."""
+    env = dict(os.environ, PYTHONPATH=str(REPO_DIR))
+    times, heavy = [], ""
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=workdir, env=env, capture_output=True, text=True, stdin=subprocess.DEVNULL,
+        )
+        if result.returncode != 0:
+            error = (result.stderr.strip().splitlines() or ["exit code %d" % result.returncode])[-1]
+            return {"module": module, "error": error}
+        lines = [line for line in result.stdout.splitlines() if line.startswith("import-time ")]
+        if not lines:
+            return {"module": module, "error": "module exited during import"}
+        _, elapsed, heavy = (lines[-1] + " ").split(" ", 2)
+        heavy = heavy.strip()
+        times.append(float(elapsed) * 1000)
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(times), 1),
+        "best_ms": round(min(times), 1),
+        "heavy_imports": heavy.split(",") if heavy else [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-import time of the service and agents.")
+    parser.add_argument("modules", nargs="*", default=MODULES, help="Modules to import (default: all).")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module.")
+    parser.add_argument("--memory-entries", type=int, default=200,
+                        help="Entries in the scratch research_memory.json.")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results to a JSON file.")
+    args = parser.parse_args()
+
+    # Imports run in a scratch directory holding a small research memory, so
+    # any module-level loading does real (but bounded) work and touches no real data
+    with tempfile.TemporaryDirectory() as workdir:
+        memory = {f"topic {i}": {"summary": "Sample summary. " * 20, "level": "novice", "glossary": []}
+                  for i in range(args.memory_entries)}
+        with open(Path(workdir) / "research_memory.json", "w", encoding="utf-8") as f:
+            json.dump(memory, f)
+        results = [measure(module, args.runs, workdir) for module in args.modules]
+
+    print(f"{'module':<26}{'median ms':>10}{'best ms':>10}  heavy imports")
+    for r in results:
+        if "error" in r:
+            print(f"{r['module']:<26}{'error':>10}{'':>10}  {r['error']}")
+        else:
+            print(f"{r['module']:<26}{r['median_ms']:>10}{r['best_ms']:>10}  {', '.join(r['heavy_imports'])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+# benchmarks/load_test.py
+# Concurrent load generator for the FastAPI app (in-process or over HTTP) with lost-update checks
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(REPO_DIR))
+
+from bench_pipeline import git_commit, percentiles, quiet, seed_distribution_files  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+LEVELS = ("novice", "intermediate", "advanced")
+ENDPOINTS = {
+    "research": ("POST", "/research"),
+    "generate": ("POST", "/generate"),
+    "inbox": ("GET", "/inbox"),
+    "status": ("GET", "/status"),
+    "jobs": ("GET", "/jobs"),
+    "stores": ("GET", "/stores"),
+    "outbound": ("GET", "/outbound"),
+    "metrics": ("GET", "/metrics"),
+}
+DEFAULT_MIX = "research=6,inbox=2,status=2"
+ERROR_SAMPLES = 5  # error messages kept per endpoint
+
+
+def parse_mix(text) -> dict:
+    """"research=6,inbox=2" -> {"research": 6.0, "inbox": 2.0}."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Pacer:
+    """Spaces request starts across all users to a global rate (requests per second)."""
+
+    def __init__(self, rps):
+        self.interval = 1.0 / rps
+        self.next_slot = time.perf_counter()
+
+    async def wait(self):
+        now = time.perf_counter()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class LoadRecorder:
+    def __init__(self):
+        self.latencies = {}   # endpoint -> [ms]
+        self.statuses = {}    # endpoint -> Counter of status codes / exception names
+        self.errors = {}      # endpoint -> error count
+        self.samples = {}     # endpoint -> first few error messages
+        self.written = []     # (user, topic, level, known) for every successful /research
+
+    def record(self, endpoint, ms, status, error=None):
+        self.latencies.setdefault(endpoint, []).append(ms)
+        self.statuses.setdefault(endpoint, Counter())[str(status)] += 1
+        if error is not None:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            samples = self.samples.setdefault(endpoint, [])
+            if len(samples) < ERROR_SAMPLES:
+                samples.append(error)
+
+    def report(self, seconds) -> dict:
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            errors = self.errors.get(endpoint, 0)
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / seconds, 2),
+                "errors": errors,
+                "error_rate": round(errors / len(latencies), 4),
+                "statuses": dict(self.statuses[endpoint]),
+                **percentiles(latencies),
+                "error_samples": self.samples.get(endpoint, []),
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        errors = sum(self.errors.values())
+        return {
+            "seconds": round(seconds, 3),
+            "requests": total,
+            "rps": round(total / seconds, 2) if seconds else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+async def virtual_user(index, client, args, mix, titles, known, recorder, pacer, deadline):
+    rng = random.Random(args.seed * 100003 + index)
+    user = "load-shared" if args.shared_user else f"load-user-{index}"
+    names, weights = list(mix), list(mix.values())
+    sent = 0
+    while time.perf_counter() < deadline and (not args.requests_per_user or sent < args.requests_per_user):
+        if pacer is not None:
+            await pacer.wait()
+            if time.perf_counter() >= deadline:
+                break
+        endpoint = rng.choices(names, weights)[0]
+        method, path = ENDPOINTS[endpoint]
+        body = None
+        if endpoint in ("research", "generate"):
+            n = index * 1000000 + sent
+            topic = f"Unknown topic {n}" if rng.random() < args.miss_ratio else f"{rng.choice(titles)} {n}"
+            body = {"topic": topic, "level": rng.choice(LEVELS), "user": user}
+
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            status = response.status_code
+            if endpoint in ("inbox", "metrics"):
+                await response.aread()
+        except Exception as e:
+            recorder.record(endpoint, (time.perf_counter() - started) * 1000, type(e).__name__, f"{type(e).__name__}: {e}")
+        else:
+            elapsed = (time.perf_counter() - started) * 1000
+            error = None if status < 400 else f"{status}: {response.text[:200]}"
+            recorder.record(endpoint, elapsed, status, error)
+            if endpoint == "research" and error is None:
+                recorder.written.append((user, body["topic"], body["level"], known(body["topic"])))
+        sent += 1
+        if args.think:
+            await asyncio.sleep(rng.uniform(0, 2 * args.think))
+
+
+async def drive(client, args, mix, titles, known) -> dict:
+    """Run the virtual users (and the optional background autonomous job) against ``client``."""
+    recorder = LoadRecorder()
+    job = None
+    if args.autonomous_topics:
+        topics = [f"{titles[i % len(titles)]} {9000000 + i}" for i in range(args.autonomous_topics)]
+        response = await client.post("/autonomous", json={"topics": topics, "workers": 4})
+        job = response.json().get("job_id")
+
+    pacer = Pacer(args.rps) if args.rps else None
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        virtual_user(i, client, args, mix, titles, known, recorder, pacer, deadline) for i in range(args.users)
+    ))
+    report = recorder.report(time.perf_counter() - started)
+
+    if job:
+        for _ in range(int(args.job_timeout * 10)):
+            data = (await client.get(f"/jobs/{job}")).json()
+            if data["status"] not in ("queued", "running"):
+                break
+            await asyncio.sleep(0.1)
+        report["autonomous_job"] = {k: data.get(k) for k in ("job_id", "status", "seconds", "counts", "error")}
+    report["written"] = recorder.written
+    return report
+
+
+def check_lost_updates(written, root) -> dict:
+    """Verify each successful /research left its topic in the user's memory and inbox files.
+
+    Memory is only checked for topics Wikipedia knows: web search results are
+    distributed but not stored in memory.
+    """
+    from json_io import read_json
+    from memory_store import open_memory_store
+    from user_stores import inbox_file_for, memory_file_for
+
+    root = Path(root)
+    missing_memory, missing_inbox = [], []
+    by_user = {}
+    for user, topic, level, known in written:
+        by_user.setdefault(user, []).append((topic, level, known))
+    for user, entries in by_user.items():
+        memory = open_memory_store(root / memory_file_for(user))
+        digest = read_json(root / inbox_file_for(user), {}).get("weekly_digest", {})
+        inbox = Counter((level, item["topic"]) for level, items in digest.items() for item in items)
+        for topic, level, known in entries:
+            if known and memory.get(topic) is None:
+                missing_memory.append(f"{user}: {topic}")
+            if inbox[(level, topic)] < 1:
+                missing_inbox.append(f"{user}: {topic}")
+    return {
+        "checked": len(written),
+        "users": len(by_user),
+        "memory_missing": len(missing_memory),
+        "inbox_missing": len(missing_inbox),
+        "examples": (missing_memory + missing_inbox)[:10],
+        "ok": not missing_memory and not missing_inbox,
+    }
+
+
+async def run_in_process(args, mix, stub) -> dict:
+    """Drive main.app through an ASGI transport, in a scratch working directory."""
+    import httpx
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="load-test-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import main
+        import research_agent_stub
+        import web_search_agent
+        research_agent_stub.WIKIPEDIA_URL = stub.url
+        web_search_agent.DUCKDUCKGO_URL = stub.url
+        if args.inbox_entries:
+            seed_distribution_files(workdir, sorted(stub.summaries), args.inbox_entries)
+
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=args.timeout) as client:
+                report = await drive(client, args, mix, sorted(stub.summaries), lambda t: stub.lookup(t) is not None)
+        # Leaving the lifespan flushed every user store, so the files are final
+        report["lost_updates"] = check_lost_updates(report.pop("written"), workdir)
+        report["workdir"] = str(workdir)
+        return report
+    finally:
+        os.chdir(previous)
+
+
+async def run_against_url(args, mix, stub) -> dict:
+    import httpx
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        report = await drive(client, args, mix, sorted(stub.summaries), lambda t: stub.lookup(t) is not None)
+    written = report.pop("written")
+    if args.server_dir:
+        # The server writes user stores behind a timer; give it time to flush
+        await asyncio.sleep(args.settle)
+        report["lost_updates"] = check_lost_updates(written, args.server_dir)
+    return report
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<10}{'requests':>9}{'rps':>9}{'err %':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, e in report["endpoints"].items():
+        print(f"{name:<10}{e['requests']:>9}{e['rps']:>9}{e['error_rate'] * 100:>8.2f}"
+              f"{e['p50_ms']:>10}{e['p95_ms']:>10}{e['p99_ms']:>10}{e['max_ms']:>10}")
+        for sample in e["error_samples"]:
+            print(f"    ! {sample}")
+    print(f"{'total':<10}{report['requests']:>9}{report['rps']:>9}{report['error_rate'] * 100:>8.2f}")
+    if "autonomous_job" in report:
+        print(f"\nautonomous job: {report['autonomous_job']}")
+    if "lost_updates" in report:
+        lost = report["lost_updates"]
+        verdict = "✅ no lost updates" if lost["ok"] else "❌ lost updates"
+        print(f"\n{verdict}: {lost['checked']} research calls checked across {lost['users']} users, "
+              f"{lost['memory_missing']} missing from memory, {lost['inbox_missing']} missing from inbox")
+        for example in lost["examples"]:
+            print(f"    - {example}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API in-process or against a running server.")
+    parser.add_argument("--url", help="Base URL of a running server (default: drive main.app in-process).")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds to generate load.")
+    parser.add_argument("--requests-per-user", type=int, default=0, help="Stop each user after this many requests.")
+    parser.add_argument("--rps", type=float, default=0.0, help="Cap on total requests per second (0 = closed loop).")
+    parser.add_argument("--think", type=float, default=0.0, help="Mean think time between a user's requests (s).")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Endpoint weights, e.g. '{DEFAULT_MIX}'. Endpoints: {', '.join(ENDPOINTS)}.")
+    parser.add_argument("--shared-user", action="store_true",
+                        help="All virtual users write to one user's files instead of one each.")
+    parser.add_argument("--miss-ratio", type=float, default=0.1, help="Fraction of research topics Wikipedia misses.")
+    parser.add_argument("--inbox-entries", type=int, default=0,
+                        help="Seed the shared inbox with this many entries (in-process only).")
+    parser.add_argument("--autonomous-topics", type=int, default=0,
+                        help="Start an autonomous job with this many topics while the load runs.")
+    parser.add_argument("--job-timeout", type=float, default=120.0, help="Seconds to wait for that job afterwards.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub upstream latency (s).")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Extra random stub latency, up to (s).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream responses that are 500s.")
+    parser.add_argument("--stub-port", type=int, default=0,
+                        help="Port for the stub upstream (use a fixed one with --url so the server can be pointed at it).")
+    parser.add_argument("--server-dir", help="Working directory of the server at --url, for lost-update checks.")
+    parser.add_argument("--settle", type=float, default=6.0, help="Seconds to wait for the server to flush (--url).")
+    parser.add_argument("--workdir", help="Working directory for the in-process app (default: a new temp dir).")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout (s).")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Show the in-process app's output.")
+    parser.add_argument("--json", metavar="FILE", help="Write the report to a JSON file.")
+    args = parser.parse_args()
+
+    stub = StubServer(port=args.stub_port, latency=args.latency, jitter=args.jitter,
+                      error_rate=args.error_rate, seed=args.seed).start()
+    import rate_limiter
+    rate_limiter.configure(stub.netloc, rate=10000, burst=10000, concurrency=256, max_concurrency=256)
+    if args.url:
+        print(f"[🧪] Stub upstream on {stub.url}; start the server with "
+              f"WIKIPEDIA_URL={stub.url} DUCKDUCKGO_URL={stub.url} (and raise its limits for {stub.netloc})")
+    print(f"[🚦] {args.users} users for {args.duration}s, mix {args.mix}"
+          + (f", capped at {args.rps} rps" if args.rps else ""))
+    try:
+        if args.url:
+            report = asyncio.run(run_against_url(args, args.mix, stub))
+        else:
+            # The in-process app's agents print per request; keep the report readable
+            with quiet(not args.verbose):
+                report = asyncio.run(run_in_process(args, args.mix, stub))
+    finally:
+        stub.stop()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "mode": args.url or "in-process",
+        "config": {k: v for k, v in vars(args).items() if k not in ("json", "verbose")},
+        **report,
+    }
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[📝] Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
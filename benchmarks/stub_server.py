@@ -0,0 +1,229 @@
+# benchmarks/stub_server.py
+# Local stand-in for the Wikipedia and DuckDuckGo endpoints, with latency and error injection
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from bench_ddg_extract import synthetic_page  # noqa: E402
+
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+SUMMARIES_FILE = FIXTURES_DIR / "wikipedia_summaries.json"
+DDG_PAGE_FILE = FIXTURES_DIR / "ddg_results.html"  # optional saved page; synthetic pages otherwise
+# "Piston 12" is served as "Piston", so benchmarks can use many distinct (uncached) titles
+VARIANT_SUFFIX = re.compile(r"[ _]\d+$")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hang up mid-page on purpose (the DuckDuckGo extractor stops early)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def load_summaries(path=SUMMARIES_FILE) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class StubServer:
+    """Threaded HTTP server answering the three endpoints the agents call:
+
+    - /api/rest_v1/page/summary/<title>  (Wikipedia REST summary)
+    - /w/api.php?action=query&titles=a|b  (Wikipedia batch extracts, formatversion 2)
+    - /html/?q=<query>                    (DuckDuckGo HTML results)
+
+    Each request sleeps ``latency`` plus up to ``jitter`` seconds, then fails
+    with a 500 with probability ``error_rate`` or a 429 (with Retry-After)
+    with probability ``throttle_rate``.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=1.0, summaries=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.summaries = load_summaries() if summaries is None else summaries
+        self.ddg_page = DDG_PAGE_FILE.read_text(encoding="utf-8") if DDG_PAGE_FILE.exists() else None
+        self.counts = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def netloc(self) -> str:
+        return urlsplit(self.url).netloc
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts.clear()
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _roll(self):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if roll < self.error_rate:
+            return delay, 500
+        if roll < self.error_rate + self.throttle_rate:
+            return delay, 429
+        return delay, None
+
+    def lookup(self, title):
+        title = VARIANT_SUFFIX.sub("", unquote(title).replace("_", " ")).strip()
+        return self.summaries.get(title)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoints
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type="application/json", headers=None):
+                data = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query)
+                if parts.path.startswith("/api/rest_v1/page/summary/"):
+                    kind = "summary"
+                elif parts.path == "/w/api.php":
+                    kind = "batch"
+                elif parts.path.rstrip("/") == "/html":
+                    kind = "search"
+                else:
+                    stub._count("not_found")
+                    return self._send(404, json.dumps({"error": "unknown endpoint"}))
+
+                delay, failure = stub._roll()
+                if delay:
+                    time.sleep(delay)
+                if failure == 500:
+                    stub._count(f"{kind}_500")
+                    return self._send(500, json.dumps({"error": "injected failure"}))
+                if failure == 429:
+                    stub._count(f"{kind}_429")
+                    return self._send(429, json.dumps({"error": "injected throttle"}),
+                                      headers={"Retry-After": str(stub.retry_after)})
+                stub._count(kind)
+
+                if kind == "summary":
+                    page = stub.lookup(parts.path.rsplit("/", 1)[1])
+                    if page is None:
+                        return self._send(404, json.dumps({"type": "not_found", "title": "Not found."}))
+                    return self._send(200, json.dumps(page))
+
+                if kind == "batch":
+                    pages = []
+                    for title in query.get("titles", [""])[0].split("|"):
+                        page = stub.lookup(title)
+                        if page is None:
+                            pages.append({"title": title, "missing": True})
+                        else:
+                            pages.append({"title": title, "extract": page["extract"]})
+                    return self._send(200, json.dumps({"batchcomplete": True, "query": {"pages": pages}}))
+
+                topic = re.sub(r" explanation$", "", query.get("q", [""])[0])
+                html = stub.ddg_page or synthetic_page(topic or "result", results=30)
+                return self._send(200, html, "text/html; charset=UTF-8")
+
+        return Handler
+
+
+def record(titles, path=SUMMARIES_FILE):
+    """Fetch live Wikipedia summaries for ``titles`` into the fixture file."""
+    import http_client
+    summaries = load_summaries(path) if Path(path).exists() else {}
+    for title in titles:
+        response = http_client.get(f"https://en.wikipedia.org/api/rest_v1/page/summary/{title.replace(' ', '_')}")
+        if response.status_code != 200:
+            print(f"[⚠️] {title}: HTTP {response.status_code}")
+            continue
+        data = response.json()
+        summaries[title] = {k: data.get(k) for k in ("type", "title", "description", "extract")}
+        print(f"[✅] Recorded {title}")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summaries, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stand-in Wikipedia/DuckDuckGo endpoints for benchmarks.")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Extra random latency, up to this many seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with a 429.")
+    parser.add_argument("--record", nargs="+", metavar="TITLE",
+                        help="Fetch these live Wikipedia summaries into the fixtures instead of serving.")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+
+    server = StubServer(port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        throttle_rate=args.throttle_rate, retry_after=args.retry_after)
+    print(f"[🧪] Stub endpoints on {server.url} ({len(server.summaries)} recorded summaries)")
+    print(f"    WIKIPEDIA_URL={server.url} DUCKDUCKGO_URL={server.url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
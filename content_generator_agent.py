@@ -2,24 +2,18 @@
 # Uses a research summary to generate educational or marketing content
 
 from pathlib import Path
-import json
 from random import choice
 
-# Load previous memory from the research agent
-MEMORY_FILE = Path("research_memory.json")
-
-if not MEMORY_FILE.exists():
-    print("No research memory found. Please run the research agent first.")
-    exit()
+from memory_store import open_memory_store
 
-with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-    memory = json.load(f)
+# Previous memory from the research agent (opened by main(), not at import)
+MEMORY_FILE = Path("research_memory.json")
 
-def choose_topic():
+def choose_topic(memory):
     topics = list(memory.keys())
     if not topics:
         print("No topics found in memory.")
-        exit()
+        return None
     print("\nAvailable topics:")
     for i, t in enumerate(topics):
         print(f"{i+1}. {t}")
@@ -54,11 +48,20 @@ def generate_content(topic_data: dict, format_type: str = "educational") -> str:
 
     return content
 
-if __name__ == "__main__":
-    topic = choose_topic()
+def main():
+    memory = open_memory_store(MEMORY_FILE)
+    if not len(memory):
+        print("No research memory found. Please run the research agent first.")
+        return
+    topic = choose_topic(memory)
+    if topic is None:
+        return
     topic_data = memory[topic]
     format_type = input("Enter content format (educational/linkedin_post): ").strip()
     output = generate_content(topic_data, format_type)
 
     print("\n--- Generated Content ---\n")
     print(output)
+
+if __name__ == "__main__":
+    main()
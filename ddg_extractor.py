@@ -0,0 +1,85 @@
+# ddg_extractor.py
+# Streaming extraction of DuckDuckGo HTML result titles/snippets that stops once enough are found
+
+import codecs
+from html.parser import HTMLParser
+
+TITLE_CLASS = "result__a"
+SNIPPET_CLASS = "result__snippet"
+CHUNK_SIZE = 16 * 1024
+
+
+class _Enough(Exception):
+    """Raised from a parser callback to abandon the rest of the page."""
+
+
+class ResultParser(HTMLParser):
+    """Event-driven parser collecting the text of ``<a class="...css_class...">`` anchors.
+
+    Raises _Enough as soon as ``limit`` anchors are complete, so the rest of
+    the current chunk is not parsed either.
+    """
+
+    def __init__(self, css_class=TITLE_CLASS, limit=3):
+        super().__init__(convert_charrefs=True)
+        self.css_class = css_class
+        self.limit = limit
+        self.results = []
+        self._parts = None  # text pieces of the anchor being read, None outside one
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a" or self._parts is not None:
+            return
+        for name, value in attrs:
+            if name == "class" and value and self.css_class in value.split():
+                self._parts = []
+                return
+
+    def handle_data(self, data):
+        if self._parts is not None:
+            self._parts.append(data)
+
+    def handle_endtag(self, tag):
+        if tag != "a" or self._parts is None:
+            return
+        text = " ".join("".join(self._parts).split())
+        self._parts = None
+        if text:
+            self.results.append(text)
+            if len(self.results) >= self.limit:
+                raise _Enough
+
+
+def extract(chunks, css_class=TITLE_CLASS, limit=3, cancel_event=None) -> list:
+    """Texts of the first ``limit`` result anchors with ``css_class``.
+
+    ``chunks`` is a whole page (str) or an iterable of str/bytes pieces, e.g. a
+    streamed response body; bytes are decoded as UTF-8. Iteration stops as soon
+    as the limit is reached, or ``cancel_event`` is set, so the remaining body
+    is never read.
+    """
+    parser = ResultParser(css_class, limit)
+    if isinstance(chunks, (str, bytes)):
+        chunks = (chunks,)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        for chunk in chunks:
+            if cancel_event is not None and cancel_event.is_set():
+                return parser.results
+            parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+    except _Enough:
+        pass
+    return parser.results
+
+
+def extract_from_response(response, css_class=TITLE_CLASS, limit=3, cancel_event=None) -> list:
+    """extract() over a ``stream=True`` requests response, closing it once done.
+
+    Closing early drops the connection instead of downloading the rest of the page.
+    """
+    try:
+        return extract(response.iter_content(chunk_size=CHUNK_SIZE), css_class, limit, cancel_event)
+    finally:
+        response.close()
@@ -5,58 +5,31 @@ import json
 from pathlib import Path
 from datetime import datetime
 
-# Section-routing rules based on topic keywords
-ROUTING_RULES = {
-    "fuel": "mechanical_systems",
-    "sensor": "electrical_systems",
-    "combustion": "advanced_topics",
-    "ignition": "mechanical_systems",
-    "beginner": "basic_concepts"
-}
-
-MEMORY_FILE = None
+import metrics
+import status_snapshot
+from memory_store import open_memory_store
+from section_router import get_router
+
+# Section-routing rules live in routing_rules.json and are compiled once by section_router
+
+MEMORY_FILE = Path("research_memory.json")
 INBOX_FILE = Path("internal_inbox.json")
 SECTION_STORAGE = Path("section_outputs.json")
 
-# Load memory
-if not MEMORY_FILE.exists():
-    print("No research memory found. Run another agent first.")
-    exit()
-
-with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-    memory = json.load(f)
-
-# Load or init inbox and section output
-inbox = json.loads(INBOX_FILE.read_text("utf-8")) if INBOX_FILE.exists() else {}
-sections = json.loads(SECTION_STORAGE.read_text("utf-8")) if SECTION_STORAGE.exists() else {}
-
-def route_to_section(topic, data):
-    """Route summary to a named section based on keyword clusters."""
-    topic_lower = topic.lower()
-    keywords_to_sections = {
-        "mechanical_systems": ["engine", "piston", "combustion", "transmission", "fuel"],
-        "electronics": ["electric", "sensor", "voltage", "circuit", "controller"],
-        "diagnostics": ["fault", "error", "obd", "diagnose", "malfunction"],
-        "learning_guides": ["introduction", "basics", "overview", "fundamentals"],
-        "advanced_topics": ["optimization", "efficiency", "dynamics", "calibration"]
-    }
+def route_to_section(topic, data, sections):
+    """Route summary to every section whose keywords match the topic."""
+    target_sections = get_router().route(topic, data["level"])
+
+    for target_section in target_sections:
+        sections.setdefault(target_section, []).append({
+            "topic": topic,
+            "summary": data["summary"],
+            "level": data["level"],
+            "timestamp": datetime.now().isoformat()
+        })
+    print(f"[✅ Routed to sections: {', '.join(target_sections)}]")
 
-    for section, keywords in keywords_to_sections.items():
-        if any(kw in topic_lower for kw in keywords):
-            target_section = section
-            break
-    else:
-        target_section = "general_knowledge"
-
-    sections.setdefault(target_section, []).append({
-        "topic": topic,
-        "summary": data["summary"],
-        "level": data["level"],
-        "timestamp": datetime.now().isoformat()
-    })
-    print(f"[✅ Routed to section: {target_section}]")
-
-def create_weekly_digest():
+def create_weekly_digest(memory, inbox):
     """Compile a summary of topics for inbox-style weekly report."""
     digest = {
         "timestamp": datetime.now().isoformat(),
@@ -71,84 +44,94 @@ def create_weekly_digest():
     inbox[digest["timestamp"]] = digest
     print("[📩 Weekly digest sent to inbox]")
 
-def save_outputs():
+def save_outputs(inbox, sections):
     with open(INBOX_FILE, "w", encoding="utf-8") as f:
         json.dump(inbox, f, indent=2)
     with open(SECTION_STORAGE, "w", encoding="utf-8") as f:
         json.dump(sections, f, indent=2)
+    status_snapshot.record_inbox(INBOX_FILE, inbox)
+
+def main():
+    # Memory, inbox and section output are loaded here rather than at import,
+    # so the API and autonomous runner can import this module without I/O
+    memory = open_memory_store(MEMORY_FILE)
+    if not len(memory):
+        print("No research memory found. Run another agent first.")
+        return
+    inbox = json.loads(INBOX_FILE.read_text("utf-8")) if INBOX_FILE.exists() else {}
+    sections = json.loads(SECTION_STORAGE.read_text("utf-8")) if SECTION_STORAGE.exists() else {}
 
-if __name__ == "__main__":
     print("\n[📤 Distribution Agent]")
     for topic, data in memory.items():
-        route_to_section(topic, data)
+        route_to_section(topic, data, sections)
 
-    create_weekly_digest()
-    save_outputs()
+    create_weekly_digest(memory, inbox)
+    save_outputs(inbox, sections)
     print("\n[✅ Distribution complete. Sections and inbox updated.]")
 
+if __name__ == "__main__":
+    main()
+
 from pathlib import Path
-import json
+import threading
 from datetime import datetime
 
-def distribute_summary(topic, summary, level="novice", inbox_file=None, section_file=None):
-    print(f"[📦] Distributing summary for '{topic}' (level: {level})")
+from json_io import read_json, write_json_atomic
 
-    # Use default files if not provided
-    inbox_file = inbox_file or Path("internal_inbox.json")
-    section_file = section_file or Path("section_outputs.json")
-
-    # --- SECTION ROUTING ---
-    ROUTING_RULES = {
-        "fuel": "mechanical_systems",
-        "sensor": "electrical_systems",
-        "combustion": "advanced_topics",
-        "ignition": "mechanical_systems",
-        "beginner": "basic_concepts"
-    }
+# Serializes read-modify-write cycles on the section and inbox files within a process
+DISTRIBUTION_LOCK = threading.Lock()
 
-    sections = set()
-    for keyword, section in ROUTING_RULES.items():
-        if keyword.lower() in topic.lower():
-            sections.add(section)
-    if level == "novice":
-        sections.add("basic_concepts")
-    if not sections:
-        sections.add("general_insights")
-
-    # Load existing section data
-    if section_file.exists():
-        section_data = json.loads(section_file.read_text("utf-8"))
-    else:
-        section_data = {}
-
-    for section in sections:
-        section_data.setdefault(section, []).append({
+def apply_distribution(items, section_data, inbox):
+    """Route (topic, summary, level) items into in-memory section and inbox dicts."""
+    router = get_router()
+    digest = inbox.setdefault("weekly_digest", {})
+    for topic, summary, level in items:
+        timestamp = datetime.now().isoformat()
+
+        # --- SECTION ROUTING ---
+        for section in router.route(topic, level):
+            section_data.setdefault(section, []).append({
+                "topic": topic,
+                "summary": summary,
+                "level": level,
+                "timestamp": timestamp
+            })
+
+        # --- WEEKLY DIGEST (INBOX) ---
+        digest.setdefault(level, []).append({
             "topic": topic,
             "summary": summary,
-            "level": level,
-            "timestamp": datetime.now().isoformat()
+            "guidance": get_guidance(level),
+            "priority": get_priority(level),
+            "timestamp": timestamp
         })
 
-    with open(section_file, "w", encoding="utf-8") as f:
-        json.dump(section_data, f, indent=2)
+def distribute_summaries(items, inbox_file=None, section_file=None):
+    """Distribute many (topic, summary, level) items.
 
-    # --- WEEKLY DIGEST (INBOX) ---
-    if inbox_file.exists():
-        inbox = json.loads(inbox_file.read_text("utf-8"))
-    else:
-        inbox = {}
+    Each target file is read once, updated in memory for the whole batch and
+    replaced atomically once.
+    """
+    items = list(items)
+    if not items:
+        return
+    print(f"[📦] Distributing {len(items)} summaries")
 
-    digest = inbox.setdefault("weekly_digest", {})
-    digest.setdefault(level, []).append({
-        "topic": topic,
-        "summary": summary,
-        "guidance": get_guidance(level),
-        "priority": get_priority(level),
-        "timestamp": datetime.now().isoformat()
-    })
-
-    with open(inbox_file, "w", encoding="utf-8") as f:
-        json.dump(inbox, f, indent=2)
+    # Use default files if not provided
+    inbox_file = inbox_file or Path("internal_inbox.json")
+    section_file = section_file or Path("section_outputs.json")
+
+    with metrics.timer("distribute"), DISTRIBUTION_LOCK:
+        section_data = read_json(section_file, {})
+        inbox = read_json(inbox_file, {})
+        apply_distribution(items, section_data, inbox)
+        metrics.inc("bytes_written_total", write_json_atomic(section_file, section_data), target="sections")
+        metrics.inc("bytes_written_total", write_json_atomic(inbox_file, inbox), target="inbox")
+        status_snapshot.record_inbox(inbox_file, inbox)
+
+def distribute_summary(topic, summary, level="novice", inbox_file=None, section_file=None):
+    print(f"[📦] Distributing summary for '{topic}' (level: {level})")
+    distribute_summaries([(topic, summary, level)], inbox_file, section_file)
 
 def get_guidance(level):
     return {
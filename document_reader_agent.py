@@ -1,33 +1,91 @@
 # document_reader_agent.py
 # Extracts and summarizes content from PDF, DOCX, or text files using skill-aware style
 
+import argparse
+import glob
+import hashlib
 import os
-import json
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import PyPDF2
-import docx
 
 from research_agent_stub import apply_skill_level_tone, extract_glossary_terms
+from memory_store import open_memory_store
+from json_io import read_json, write_json_atomic
+from summarizer import summarize_text
 
 MEMORY_FILE = Path("research_memory.json")
+PAGES_PER_TASK = 25  # page range handed to each worker in parallel mode
+TXT_BLOCK_CHARS = 64 * 1024  # text files are streamed to the summarizer in blocks
+INGEST_MANIFEST = Path("ingest_manifest.json")
+INGEST_BATCH_SIZE = 50  # documents committed to memory per transaction
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
 
-# Load or initialize memory
-if MEMORY_FILE.exists():
-    with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-        memory = json.load(f)
-else:
-    memory = {}
+# PyPDF2 and python-docx are imported where they are used, so importing this
+# module (or running a .txt-only ingest) does not pay for them
 
-def extract_text_from_pdf(file_path):
-    text = ""
+def count_pdf_pages(file_path):
+    import PyPDF2
+    with open(file_path, "rb") as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+def iter_pdf_pages(file_path, start=0, stop=None):
+    """Yield the text of each page lazily, from page ``start`` up to ``stop``."""
+    import PyPDF2
+    with open(file_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+        for number in range(start, stop):
+            yield reader.pages[number].extract_text() or ""
+
+def _extract_page_range(file_path, start, stop):
+    # Runs in a worker process, so it must stay a module-level function
+    return list(iter_pdf_pages(file_path, start, stop))
+
+def iter_pdf_pages_parallel(file_path, workers=None, pages_per_task=PAGES_PER_TASK):
+    """Yield page texts in order while page ranges are extracted on a process pool.
+
+    Closing the generator early cancels the ranges that have not started yet.
+    """
+    total = count_pdf_pages(file_path)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    futures = [
+        pool.submit(_extract_page_range, str(file_path), start, min(start + pages_per_task, total))
+        for start in range(0, total, pages_per_task)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def extract_text_from_pdf(file_path, max_chars=None, workers=None):
+    """Extract PDF text, stopping once ``max_chars`` characters have been collected.
+
+    ``workers`` > 1 extracts page ranges in parallel processes, which pays off
+    for long documents.
+    """
+    parts = []
+    collected = 0
+    pages = None
     try:
-        with open(file_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                text += page.extract_text() or ""
+        if workers and workers > 1:
+            pages = iter_pdf_pages_parallel(file_path, workers)
+        else:
+            pages = iter_pdf_pages(file_path)
+        for page_text in pages:
+            parts.append(page_text)
+            collected += len(page_text)
+            if max_chars is not None and collected >= max_chars:
+                break
     except Exception as e:
         print(f"Error reading PDF: {e}")
-    return text
+    finally:
+        if pages is not None:
+            pages.close()
+    text = "".join(parts)
+    return text[:max_chars] if max_chars is not None else text
 
 def extract_text_from_txt(file_path):
     try:
@@ -39,14 +97,50 @@ def extract_text_from_txt(file_path):
 
 def extract_text_from_docx(file_path):
     try:
+        import docx
         doc = docx.Document(file_path)
         return "\n".join([para.text for para in doc.paragraphs])
     except Exception as e:
         print(f"Error reading DOCX file: {e}")
         return ""
 
-def summarize_document(text: str, topic: str, level: str):
-    short_text = text[:1000]  # Limit to first 1000 characters for prototype
+def iter_txt_blocks(file_path, block_chars=TXT_BLOCK_CHARS):
+    with open(file_path, "r", encoding="utf-8") as f:
+        for block in iter(lambda: f.read(block_chars), ""):
+            yield block
+
+def iter_docx_paragraphs(file_path):
+    import docx
+    for para in docx.Document(file_path).paragraphs:
+        yield para.text + "\n"
+
+def iter_document_text(file_path, workers=None):
+    """Stream a document's text in pieces; None if the file type is unsupported."""
+    file_path = str(file_path)
+    if file_path.endswith(".pdf"):
+        if workers and workers > 1:
+            pages = iter_pdf_pages_parallel(file_path, workers)
+        else:
+            pages = iter_pdf_pages(file_path)
+        return (page + "\n" for page in pages)
+    elif file_path.endswith(".txt"):
+        return iter_txt_blocks(file_path)
+    elif file_path.endswith(".docx"):
+        return iter_docx_paragraphs(file_path)
+    return None
+
+def digest_document(file_path, workers=None):
+    """Summarize the whole document chunk by chunk; None if the type is unsupported.
+
+    Memory use is bounded by the summarizer's chunk size, not the file size.
+    """
+    parts = iter_document_text(file_path, workers)
+    if parts is None:
+        return None
+    return summarize_text(parts, workers=workers)
+
+def build_document_output(text, topic: str, level: str) -> dict:
+    short_text = summarize_text(text)  # Extractive summary of the full text
     summary = apply_skill_level_tone(short_text, level)
     glossary = extract_glossary_terms(short_text) if level == "novice" else []
 
@@ -57,13 +151,135 @@ def summarize_document(text: str, topic: str, level: str):
         "glossary_terms": glossary,
         "note": f"Generated from file. Tailored for {level}-level learners."
     }
+    return output
 
-    memory[topic] = output
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(memory, f, indent=2)
-
+def summarize_document(text: str, topic: str, level: str):
+    output = build_document_output(text, topic, level)
+    open_memory_store(MEMORY_FILE).upsert(topic, output)
     return output
 
+# --- BULK INGESTION ---
+
+def collect_documents(target):
+    """Expand a directory (recursively), glob pattern or single file into supported paths."""
+    target_path = Path(target)
+    if target_path.is_dir():
+        candidates = target_path.rglob("*")
+    elif target_path.is_file():
+        candidates = [target_path]
+    else:
+        candidates = (Path(p) for p in glob.glob(str(target), recursive=True))
+    return sorted(p for p in candidates if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS)
+
+def _topic_root(target):
+    """Directory the topic names of an ingest are relative to."""
+    target_path = Path(target)
+    if target_path.is_dir():
+        return target_path
+    if target_path.is_file():
+        return target_path.parent
+    parts = []
+    for part in target_path.parts:  # glob: the part before the first wildcard
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return Path(*parts)
+
+def document_topics(files, target) -> dict:
+    """Topic per file: its path under ``target`` without the suffix ("a/report").
+
+    Files that would still share a topic (a/report.pdf and a/report.txt) keep their suffix.
+    """
+    root = _topic_root(target)
+    topics = {f: f.relative_to(root).with_suffix("").as_posix() for f in files}
+    taken = Counter(topics.values())
+    return {f: f.relative_to(root).as_posix() if taken[topic] > 1 else topic for f, topic in topics.items()}
+
+def hash_file(file_path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_file=INGEST_MANIFEST):
+    return read_json(manifest_file, {})
+
+def save_manifest(manifest, manifest_file=INGEST_MANIFEST):
+    write_json_atomic(manifest_file, manifest)
+
+def _ingest_one(file_path, topic, level, known_hash=None):
+    # Runs in a worker process: hash the file and, if it changed, extract and
+    # summarize it; returns the hash and only the small output
+    content_hash = hash_file(file_path)
+    if content_hash == known_hash:
+        return content_hash, None
+    text = digest_document(file_path)
+    if not text:
+        return content_hash, None
+    return content_hash, build_document_output(text, topic, level)
+
+def ingest_documents(target, level="novice", workers=None, batch_size=INGEST_BATCH_SIZE,
+                     manifest_file=INGEST_MANIFEST, force=False):
+    """Ingest every supported document under ``target`` into research memory.
+
+    Each document's topic is its path under ``target`` (see document_topics).
+    Files whose content hash matches the manifest from the previous ingest are
+    skipped. Hashing and extraction run on a process pool and results are
+    committed to memory every ``batch_size`` documents. Returns throughput statistics.
+    """
+    started = time.perf_counter()
+    files = collect_documents(target)
+    topics = document_topics(files, target)
+    manifest = load_manifest(manifest_file)
+
+    stats = {"files": len(files), "ingested": 0, "skipped": 0, "failed": 0, "bytes": 0}
+    batch, batch_hashes = {}, {}
+    memory = open_memory_store(MEMORY_FILE)
+
+    def commit():
+        if batch:
+            memory.upsert_many(batch)
+        manifest.update(batch_hashes)
+        save_manifest(manifest, manifest_file)
+        batch.clear()
+        batch_hashes.clear()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for file_path in files:
+            key = str(file_path.resolve())
+            known_hash = None if force else manifest.get(key)
+            futures.append((file_path, key, known_hash,
+                            pool.submit(_ingest_one, str(file_path), topics[file_path], level, known_hash)))
+        for file_path, key, known_hash, future in futures:
+            try:
+                content_hash, output = future.result()
+            except Exception as e:
+                print(f"Error ingesting {file_path}: {e}")
+                content_hash, output = None, None
+            if output is None:
+                stats["skipped" if content_hash is not None and content_hash == known_hash else "failed"] += 1
+                continue
+            batch[output["topic"]] = output
+            batch_hashes[key] = content_hash
+            stats["ingested"] += 1
+            stats["bytes"] += file_path.stat().st_size
+            if len(batch) >= batch_size:
+                commit()
+    commit()
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["files_per_sec"] = round(stats["ingested"] / elapsed, 2) if elapsed else 0.0
+    stats["bytes_per_sec"] = round(stats["bytes"] / elapsed, 1) if elapsed else 0.0
+    print(
+        f"[📚] Ingested {stats['ingested']} of {stats['files']} files "
+        f"({stats['skipped']} unchanged, {stats['failed']} failed) in {stats['seconds']}s: "
+        f"{stats['files_per_sec']} files/sec, {stats['bytes_per_sec']} bytes/sec"
+    )
+    return stats
+
 def print_output(data: dict):
     print(f"\n** Topic: {data['topic']}\nLevel: {data['level']}\n")
     print(f"** Summary:\n{data['summary']}\n")
@@ -73,18 +289,17 @@ def print_output(data: dict):
             print(f"- {term}")
     print(f"\nNote: {data['note']}")
 
-if __name__ == "__main__":
+def run_interactive():
     file_path = input("Enter the path to your .pdf, .docx, or .txt file: ").strip()
     topic_name = input("Enter a topic name for this document: ").strip()
     user_level = input("Enter your skill level (novice/intermediate/advanced): ").strip().lower()
 
-    if file_path.endswith(".pdf"):
-        full_text = extract_text_from_pdf(file_path)
-    elif file_path.endswith(".txt"):
-        full_text = extract_text_from_txt(file_path)
-    elif file_path.endswith(".docx"):
-        full_text = extract_text_from_docx(file_path)
-    else:
+    try:
+        full_text = digest_document(file_path, workers=os.cpu_count())
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        exit()
+    if full_text is None:
         print("Unsupported file type. Only .pdf, .docx, and .txt are supported.")
         exit()
 
@@ -95,3 +310,17 @@ if __name__ == "__main__":
     result = summarize_document(full_text, topic_name, user_level)
     print("\n--- Document Reader Agent Output ---")
     print_output(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize documents into research memory.")
+    parser.add_argument("--ingest", metavar="DIR_OR_GLOB",
+                        help="Bulk-ingest a directory or glob instead of prompting for one file.")
+    parser.add_argument("--level", default="novice", help="Skill level for ingested summaries.")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction processes (default: CPU count).")
+    parser.add_argument("--force", action="store_true", help="Re-ingest files even if unchanged.")
+    args = parser.parse_args()
+
+    if args.ingest:
+        ingest_documents(args.ingest, args.level, workers=args.workers, force=args.force)
+    else:
+        run_interactive()
@@ -0,0 +1,178 @@
+# evaluation_store.py
+# Indexed SQLite store for evaluation results: ordered leaderboards and score range queries
+
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+EVAL_FILE = Path("evaluation_results.json")
+SCORE_FIELDS = {"clarity": "clarity", "tone": "tone", "combined": "combined"}
+
+_stores = {}
+_stores_lock = threading.Lock()
+_LEVEL_COMMENT = re.compile(r"skill level: (\w+)")
+
+
+def _level_from(evaluation):
+    # Older results only record the level inside the comment
+    match = _LEVEL_COMMENT.search(evaluation.get("Overall Comment", ""))
+    return match.group(1) if match else None
+
+
+class EvaluationStore:
+    """Evaluations keyed by topic, with B-tree indexes on the combined score
+    (overall and per level) and on each individual score.
+
+    Top/bottom-k queries walk an index from one end, so they cost O(k log n)
+    rather than a full sort; range queries only visit matching rows.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS evaluations ("
+            " topic TEXT PRIMARY KEY, level TEXT, clarity REAL, tone REAL, combined REAL,"
+            " summary_hash TEXT, timestamp TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS evaluations_combined ON evaluations (combined, topic)")
+        conn.execute("CREATE INDEX IF NOT EXISTS evaluations_level ON evaluations (level, combined, topic)")
+        conn.execute("CREATE INDEX IF NOT EXISTS evaluations_clarity ON evaluations (clarity)")
+        conn.execute("CREATE INDEX IF NOT EXISTS evaluations_tone ON evaluations (tone)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put_many(self, evaluations: dict, levels: dict = None):
+        """Insert or replace {topic: evaluation} in one transaction.
+
+        ``levels`` maps topics to skill levels; missing ones are read from the
+        evaluation's comment.
+        """
+        levels = levels or {}
+        timestamp = datetime.now().isoformat()
+        rows = []
+        for topic, evaluation in evaluations.items():
+            clarity = evaluation.get("Clarity Score")
+            tone = evaluation.get("Tone Fit Score")
+            combined = (clarity + tone) / 2 if clarity is not None and tone is not None else None
+            rows.append((
+                topic, levels.get(topic) or _level_from(evaluation), clarity, tone, combined,
+                evaluation.get("Summary Hash"), timestamp, json.dumps(evaluation),
+            ))
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO evaluations"
+                " (topic, level, clarity, tone, combined, summary_hash, timestamp, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def put(self, topic, evaluation, level=None):
+        self.put_many({topic: evaluation}, {topic: level})
+
+    def get(self, topic, default=None):
+        row = self._conn().execute("SELECT data FROM evaluations WHERE topic = ?", (topic,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def hashes(self) -> dict:
+        """{topic: summary hash} for incremental re-evaluation."""
+        return dict(self._conn().execute("SELECT topic, summary_hash FROM evaluations"))
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    def _ranked(self, k, level, descending):
+        order = "DESC" if descending else "ASC"
+        where = "WHERE combined IS NOT NULL" + (" AND level = ?" if level else "")
+        params = ((level,) if level else ()) + (k,)
+        return self._conn().execute(
+            f"SELECT topic, clarity, tone FROM evaluations {where}"
+            f" ORDER BY combined {order}, topic {order} LIMIT ?",
+            params,
+        ).fetchall()
+
+    def top(self, k=3, level=None) -> list:
+        """Best ``k`` (topic, clarity, tone) by combined score, best first."""
+        return self._ranked(k, level, descending=True)
+
+    def bottom(self, k=3, level=None) -> list:
+        """Worst ``k`` (topic, clarity, tone) by combined score, worst first."""
+        return self._ranked(k, level, descending=False)
+
+    def range(self, field, low=None, high=None, level=None, limit=None) -> list:
+        """Topics with ``low <= field < high`` for field clarity, tone or combined, lowest first.
+
+        Returns (topic, clarity, tone) tuples; e.g. range("tone", high=40) is
+        the set of summaries worth regenerating.
+        """
+        column = SCORE_FIELDS[field]
+        clauses, params = [f"{column} IS NOT NULL"], []
+        if low is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(low)
+        if high is not None:
+            clauses.append(f"{column} < ?")
+            params.append(high)
+        if level:
+            clauses.append("level = ?")
+            params.append(level)
+        sql = f"SELECT topic, clarity, tone FROM evaluations WHERE {' AND '.join(clauses)} ORDER BY {column}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._conn().execute(sql, params).fetchall()
+
+    def get_meta(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self._conn().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+
+def migrate_json_evaluations(json_file, store: EvaluationStore) -> int:
+    """One-shot import of evaluation_results.json; recorded in the store so it runs once."""
+    json_file = Path(json_file)
+    marker = f"migrated:{json_file.name}"
+    if not json_file.exists() or store.get_meta(marker):
+        return 0
+    with open(json_file, "r", encoding="utf-8") as f:
+        legacy = json.load(f)
+    existing = store.hashes()
+    store.put_many({t: e for t, e in legacy.items() if t not in existing})
+    store.set_meta(marker, datetime.now().isoformat())
+    print(f"[🗄️] Migrated {len(legacy)} evaluations from {json_file}")
+    return len(legacy)
+
+
+def open_evaluation_store(eval_file=None) -> EvaluationStore:
+    """Shared store for an evaluation results path (data lives next to it as .sqlite3)."""
+    if isinstance(eval_file, EvaluationStore):
+        return eval_file
+    eval_file = Path(eval_file or EVAL_FILE)
+    key = str(eval_file.resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = EvaluationStore(eval_file.with_suffix(".sqlite3"))
+            migrate_json_evaluations(eval_file, store)
+            _stores[key] = store
+    return store
@@ -1,35 +1,35 @@
 # evaluator_agent.py
 # Scores research summaries based on clarity, tone, and alignment with skill level
 
-import json
+import argparse
+import hashlib
 from pathlib import Path
-from textblob import TextBlob
+
+import metrics
+from evaluation_store import open_evaluation_store
+from memory_store import open_memory_store
 
 MEMORY_FILE = Path("research_memory.json")
 EVAL_FILE = Path("evaluation_results.json")
+SHORT_WORD = 5   # novice tone: words of at most this many characters
+LONG_WORD = 7    # advanced tone: words longer than this
 
-# Load research memory
-if not MEMORY_FILE.exists():
-    print("No research memory found. Run another agent first.")
-    exit()
-
-with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-    memory = json.load(f)
+# NumPy is only needed for batch evaluation and is imported there
 
 def evaluate_clarity(text):
-    blob = TextBlob(text)
     score = 100 - abs(len(text) - 700) * 0.05  # Penalize overly short/long responses
     score = min(max(score, 0), 100)
     return round(score, 1)
 
 def evaluate_tone_match(level, text):
+    words = text.split()
     if level == "novice":
-        simple_terms = sum(1 for word in text.split() if len(word) <= 5)
-        ratio = simple_terms / max(len(text.split()), 1)
+        simple_terms = sum(1 for word in words if len(word) <= SHORT_WORD)
+        ratio = simple_terms / max(len(words), 1)
         score = ratio * 100
     elif level == "advanced":
-        complex_terms = sum(1 for word in text.split() if len(word) > 7)
-        ratio = complex_terms / max(len(text.split()), 1)
+        complex_terms = sum(1 for word in words if len(word) > LONG_WORD)
+        ratio = complex_terms / max(len(words), 1)
         score = ratio * 100
     else:
         score = 70  # Neutral estimate
@@ -39,52 +39,177 @@ def evaluate_summary(topic_data):
     text = topic_data.get("summary", "")
     level = topic_data.get("level", "unknown")
 
+    with metrics.timer("evaluate"):
+        return {
+            "Clarity Score": evaluate_clarity(text),
+            "Tone Fit Score": evaluate_tone_match(level, text),
+            "Overall Comment": f"Evaluation complete for skill level: {level}."
+        }
+
+def summary_hash(topic_data) -> str:
+    """Fingerprint of everything a score depends on (summary text and level)."""
+    text = topic_data.get("summary", "")
+    level = topic_data.get("level", "unknown")
+    return hashlib.sha1(f"{level}\0{text}".encode("utf-8")).hexdigest()
+
+_word_char = None
+
+def _word_char_table():
+    # Lookup table, True where str.split() would not break; built on first batch
+    global _word_char
+    if _word_char is None:
+        import numpy as np
+        _word_char = np.array([not chr(c).isspace() for c in range(0x3001)] + [True], dtype=bool)
+    return _word_char
+
+def _word_lengths(texts):
+    """Tokenize all texts in one pass.
+
+    Returns (lengths of every word, index of each text's first word, text
+    lengths); text i owns words ``first[i]:first[i + 1]``.
+
+    The texts are joined with a newline and viewed as one character array, so
+    word boundaries match str.split() without a Python loop over words.
+    """
+    import numpy as np
+    word_char = _word_char_table()
+    joined = "\n".join(texts)
+    if joined.isascii():
+        codes = np.frombuffer(joined.encode("ascii"), dtype=np.uint8)
+    else:
+        codes = np.frombuffer(joined.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        codes = np.minimum(codes, len(word_char) - 1)  # everything above U+3000 is a word character
+    in_word = word_char[codes]
+
+    starts = in_word.copy()
+    starts[1:] &= ~in_word[:-1]
+    ends = in_word.copy()
+    ends[:-1] &= ~in_word[1:]
+    starts = np.flatnonzero(starts)
+    lengths = np.flatnonzero(ends) - starts + 1
+
+    text_lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    text_starts = np.cumsum(text_lengths + 1) - (text_lengths + 1)
+    first = np.append(np.searchsorted(starts, text_starts), len(starts))
+    return lengths, first, text_lengths
+
+def _count_per_text(mask, first):
+    # Segment sums of a per-word boolean mask via one cumulative sum
+    import numpy as np
+    totals = np.concatenate(([0], np.cumsum(mask)))
+    return totals[first[1:]] - totals[first[:-1]]
+
+def evaluate_summaries(records: dict) -> dict:
+    """Score many {topic: topic_data} entries at once; same results as evaluate_summary."""
+    import numpy as np
+    topics = list(records)
+    if not topics:
+        return {}
+    texts = [records[t].get("summary", "") for t in topics]
+    levels = [records[t].get("level", "unknown") for t in topics]
+    n = len(topics)
+
+    with metrics.timer("evaluate_batch"):
+        lengths, first, char_counts = _word_lengths(texts)
+        word_counts = np.diff(first)
+        short_counts = _count_per_text(lengths <= SHORT_WORD, first)
+        long_counts = _count_per_text(lengths > LONG_WORD, first)
+
+        clarity = np.clip(100 - np.abs(char_counts - 700) * 0.05, 0, 100)
+
+        denominators = np.maximum(word_counts, 1)
+        tone = np.full(n, 70.0)
+        novice = np.fromiter((level == "novice" for level in levels), dtype=bool, count=n)
+        advanced = np.fromiter((level == "advanced" for level in levels), dtype=bool, count=n)
+        tone[novice] = short_counts[novice] / denominators[novice] * 100
+        tone[advanced] = long_counts[advanced] / denominators[advanced] * 100
+        tone = np.minimum(tone, 100)
+
+    # Python's round() keeps results identical to the single-topic path
     return {
-        "Clarity Score": evaluate_clarity(text),
-        "Tone Fit Score": evaluate_tone_match(level, text),
-        "Overall Comment": f"Evaluation complete for skill level: {level}."
+        topic: {
+            "Clarity Score": round(c, 1),
+            "Tone Fit Score": round(t, 1),
+            "Overall Comment": f"Evaluation complete for skill level: {level}."
+        }
+        for topic, c, t, level in zip(topics, clarity.tolist(), tone.tolist(), levels)
     }
 
+def evaluate_memory(store=None, eval_file=EVAL_FILE, force=False) -> dict:
+    """Re-score the whole research memory, skipping entries whose summary is unchanged.
+
+    Stored evaluations carry a "Summary Hash"; only new or changed entries
+    (or all of them with ``force``) are scored, and the results are written
+    in one transaction. Returns counts of scored and unchanged topics.
+    """
+    store = open_memory_store(store or MEMORY_FILE)
+    results = open_evaluation_store(eval_file)
+    known = {} if force else results.hashes()
+
+    changed, hashes = {}, {}
+    for topic, topic_data in store.items():
+        digest = summary_hash(topic_data)
+        if known.get(topic) == digest:
+            continue
+        changed[topic] = topic_data
+        hashes[topic] = digest
+
+    evaluations = evaluate_summaries(changed)
+    for topic, evaluation in evaluations.items():
+        evaluation["Summary Hash"] = hashes[topic]
+    if evaluations:
+        results.put_many(evaluations, {t: changed[t].get("level") for t in evaluations})
+    stats = {"scored": len(changed), "unchanged": store.count() - len(changed)}
+    print(f"[📊] Evaluated {stats['scored']} topics ({stats['unchanged']} unchanged)")
+    return stats
+
 def print_evaluation(topic, evaluation):
     print(f"\n🔎 Evaluation for: {topic}")
     for k, v in evaluation.items():
         print(f"{k}: {v}")
 
-def save_evaluation(topic, evaluation):
-    if EVAL_FILE.exists():
-        with open(EVAL_FILE, "r", encoding="utf-8") as f:
-            all_evals = json.load(f)
-    else:
-        all_evals = {}
+def save_evaluation(topic, evaluation, level=None):
+    open_evaluation_store(EVAL_FILE).put(topic, evaluation, level)
 
-    all_evals[topic] = evaluation
-    with open(EVAL_FILE, "w", encoding="utf-8") as f:
-        json.dump(all_evals, f, indent=2)
+def get_top_and_low_scores(k=3, level=None):
+    """Best and worst ``k`` as (topic, clarity, tone), both ordered best to worst."""
+    store = open_evaluation_store(EVAL_FILE)
+    return store.top(k, level), list(reversed(store.bottom(k, level)))
 
-def get_top_and_low_scores():
-    if not EVAL_FILE.exists():
-        return [], []
-    with open(EVAL_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    scored = [(k, v["Clarity Score"], v["Tone Fit Score"]) for k, v in data.items()]
-    scored.sort(key=lambda x: (x[1] + x[2]) / 2, reverse=True)
-    return scored[:3], scored[-3:]
+def get_low_tone_topics(threshold=40, level=None, limit=None):
+    """Topics whose tone fit is below ``threshold``, worst first (regeneration candidates)."""
+    return open_evaluation_store(EVAL_FILE).range("tone", high=threshold, level=level, limit=limit)
 
-if __name__ == "__main__":
-    print("\nTopics available for evaluation:")
-    topics = list(memory.keys())
-    for i, t in enumerate(topics):
-        print(f"{i+1}. {t}")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score research summaries.")
+    parser.add_argument("--all", action="store_true",
+                        help="Batch-evaluate every memory entry whose summary changed.")
+    parser.add_argument("--force", action="store_true", help="With --all, re-score unchanged entries too.")
+    args = parser.parse_args(argv)
 
-    idx = int(input("\nSelect topic number to evaluate: ")) - 1
-    chosen_topic = topics[idx]
-    topic_data = memory[chosen_topic]
+    memory = open_memory_store(MEMORY_FILE)
+    if not len(memory):
+        print("No research memory found. Run another agent first.")
+        return
+
+    if args.all:
+        evaluate_memory(memory, force=args.force)
+    else:
+        print("\nTopics available for evaluation:")
+        topics = list(memory.keys())
+        for i, t in enumerate(topics):
+            print(f"{i+1}. {t}")
 
-    eval_result = evaluate_summary(topic_data)
-    print_evaluation(chosen_topic, eval_result)
-    save_evaluation(chosen_topic, eval_result)
+        idx = int(input("\nSelect topic number to evaluate: ")) - 1
+        chosen_topic = topics[idx]
+        topic_data = memory[chosen_topic]
 
-    print("\n[📊 Evaluation saved to evaluation_results.json]")
+        eval_result = evaluate_summary(topic_data)
+        print_evaluation(chosen_topic, eval_result)
+        eval_result["Summary Hash"] = summary_hash(topic_data)
+        save_evaluation(chosen_topic, eval_result, topic_data.get("level"))
+
+        print("\n[📊 Evaluation saved to evaluation_results.sqlite3]")
 
     top, low = get_top_and_low_scores()
     print("\n🏅 Top Scoring Topics:")
@@ -94,3 +219,6 @@ if __name__ == "__main__":
     print("\n🔻 Lowest Scoring Topics:")
     for t, c, tone in low:
         print(f"- {t}: Clarity={c}, Tone Fit={tone}")
+
+if __name__ == "__main__":
+    main()
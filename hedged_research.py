@@ -0,0 +1,168 @@
+# hedged_research.py
+# Races Wikipedia against the web search fallback so topics that miss on Wikipedia don't pay both latencies
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import metrics
+import response_cache
+from json_io import read_json, write_json_atomic
+from research_agent_stub import MEMORY_FILE, generate_digestible_output, save_to_memory
+from web_search_agent import web_search_summary
+
+HEDGE_DELAY = 1.0      # seconds Wikipedia gets to answer before the web search starts too
+MISS_THRESHOLD = 2     # consecutive Wikipedia misses after which the web search starts right away
+MISS_HISTORY_FILE = Path("wikipedia_misses.json")
+WEB_FAILURES = ("No useful web results found.", "Search error occurred.")
+HEDGE_WORKERS = 16     # threads shared by the racing legs of all hedged lookups
+
+_executor = None
+_executor_lock = threading.Lock()
+_save_lock = threading.Lock()  # MissHistory.save() read-merge-write across instances
+
+
+class MissHistory:
+    """Consecutive Wikipedia misses per topic, persisted between runs ({topic key: misses}).
+
+    Only this instance's changes are written back: save() merges them into
+    the file as it is on disk, so concurrent runs don't drop each other's updates.
+    """
+
+    def __init__(self, path=MISS_HISTORY_FILE):
+        self.path = Path(path)
+        self._misses = read_json(self.path, {})
+        self._changes = {}  # key -> (reset to zero first, misses added since)
+        self._lock = threading.Lock()
+
+    def record(self, topic, missed):
+        key = response_cache.normalize_key(topic)
+        with self._lock:
+            if missed:
+                self._misses[key] = self._misses.get(key, 0) + 1
+                reset, added = self._changes.get(key, (False, 0))
+                self._changes[key] = (reset, added + 1)
+            elif self._misses.pop(key, None) is not None or key in self._changes:
+                self._changes[key] = (True, 0)
+
+    def misses(self, topic) -> int:
+        with self._lock:
+            return self._misses.get(response_cache.normalize_key(topic), 0)
+
+    def miss_prone(self, topic) -> bool:
+        return self.misses(topic) >= MISS_THRESHOLD
+
+    def save(self):
+        with self._lock:
+            changes, self._changes = self._changes, {}
+        if not changes:
+            return
+        with _save_lock:
+            data = read_json(self.path, {})
+            for key, (reset, added) in changes.items():
+                misses = added + (0 if reset else data.get(key, 0))
+                if misses:
+                    data[key] = misses
+                else:
+                    data.pop(key, None)
+            write_json_atomic(self.path, data, fsync=False)
+        with self._lock:
+            self._misses = dict(data)
+
+
+def wikipedia_missed(summary_data) -> bool:
+    summary = summary_data.get("summary")
+    return not summary or "no summary" in summary.lower()
+
+
+def acceptable(source, summary_data) -> bool:
+    if source == "wikipedia":
+        return not wikipedia_missed(summary_data)
+    return bool(summary_data.get("summary")) and summary_data["summary"] not in WEB_FAILURES
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+    return _executor
+
+
+def hedged_lookup(topic, level, delay=HEDGE_DELAY, history=None, memory_file=None) -> dict:
+    """Research ``topic`` from Wikipedia, starting the web search as well once
+    ``delay`` seconds pass without an answer (at once for miss-prone topics).
+
+    The first acceptable result wins and carries its ``source``. The legs run
+    on a shared bounded pool and have no side effects: a Wikipedia result is
+    saved to memory and recorded in ``history`` here, on the caller's thread,
+    once it has been picked. A web search that has not started is never
+    started; one in flight is told to stop reading. If neither source is
+    acceptable the web result is returned, as in the sequential fallback.
+    """
+    results = queue.Queue()
+    cancel_web = threading.Event()
+    legs = []
+
+    def run_wikipedia():
+        try:
+            data = generate_digestible_output(topic, level, save=False)
+        except Exception as e:
+            print(f"[⚠️] Wikipedia lookup failed for '{topic}': {e}")
+            data = {"summary": "No summary found.", "glossary": [], "source": "wikipedia"}
+        results.put(("wikipedia", data))
+
+    def run_web():
+        if cancel_web.is_set():
+            return  # queued behind other legs until after the race was decided
+        metrics.inc("fallbacks_total", path="hedged")
+        results.put(("web_search", web_search_summary(topic, level, cancel_event=cancel_web)))
+
+    def start(target):
+        legs.append(_get_executor().submit(target))
+
+    def finish(data):
+        cancel_web.set()
+        for leg in legs:
+            leg.cancel()  # only succeeds for legs still waiting for a pool thread
+        return data
+
+    start(run_wikipedia)
+    immediate = history is not None and history.miss_prone(topic)
+    web_started = immediate or delay <= 0
+    if web_started:
+        start(run_web)
+    pending = 1 + web_started
+    fallback = None
+
+    while pending:
+        try:
+            source, data = results.get(timeout=None if web_started else delay)
+        except queue.Empty:
+            # Wikipedia is slow: hedge with the web search
+            web_started = True
+            pending += 1
+            start(run_web)
+            continue
+        pending -= 1
+        if source == "wikipedia" and history is not None:
+            history.record(topic, wikipedia_missed(data))
+        if acceptable(source, data):
+            metrics.inc("hedged_wins_total", source=source)
+            finish(data)
+            if source == "wikipedia":
+                save_to_memory({topic: data}, level, memory_file or MEMORY_FILE)
+            return data
+        if source == "web_search":
+            fallback = data
+        elif not web_started:
+            # Clean miss before the delay ran out: fall back right away
+            print(f"⚠️ Wikipedia summary not found for '{topic}', using web search fallback.")
+            web_started = True
+            pending += 1
+            start(run_web)
+
+    metrics.inc("hedged_wins_total", source="none")
+    return finish(fallback or {"summary": "", "source": "web_search"})
@@ -0,0 +1,277 @@
+# http_client.py
+# Shared pooled HTTP client used by every agent for outbound requests
+
+import random
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import rate_limiter
+
+# requests, httpx and asyncio are imported on first use so importing an agent stays cheap
+
+# Defaults; change them with configure() rather than editing call sites
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10.0
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5   # seconds, doubled on every attempt
+BACKOFF_MAX = 8.0
+POOL_CONNECTIONS = 10  # number of hosts kept in the pool
+POOL_MAXSIZE = 20      # keep-alive connections per host
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_session = None
+_session_lock = threading.Lock()
+_async_clients = {}  # one httpx.AsyncClient per event loop
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def configure(connect_timeout=None, read_timeout=None, max_retries=None,
+              backoff_base=None, backoff_max=None, pool_connections=None, pool_maxsize=None):
+    """Override client defaults. Pool changes take effect on the next request."""
+    global CONNECT_TIMEOUT, READ_TIMEOUT, MAX_RETRIES, BACKOFF_BASE, BACKOFF_MAX
+    global POOL_CONNECTIONS, POOL_MAXSIZE
+    if connect_timeout is not None:
+        CONNECT_TIMEOUT = connect_timeout
+    if read_timeout is not None:
+        READ_TIMEOUT = read_timeout
+    if max_retries is not None:
+        MAX_RETRIES = max_retries
+    if backoff_base is not None:
+        BACKOFF_BASE = backoff_base
+    if backoff_max is not None:
+        BACKOFF_MAX = backoff_max
+    if pool_connections is not None or pool_maxsize is not None:
+        POOL_CONNECTIONS = pool_connections or POOL_CONNECTIONS
+        POOL_MAXSIZE = pool_maxsize or POOL_MAXSIZE
+        close()
+
+
+def get_session() -> "requests.Session":
+    """Return the process-wide session, creating its connection pools on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def close():
+    """Drop pooled connections (they are re-created lazily)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def parse_retry_after(value):
+    """Return the Retry-After header as seconds, or None if absent/unparseable."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter; a server-provided Retry-After wins."""
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _host_stats(host):
+    return _stats.setdefault(host, {
+        "requests": 0,
+        "retries": 0,
+        "errors": 0,
+        "latency_total": 0.0,
+        "latency_max": 0.0,
+        "latency_last": 0.0,
+        "status_counts": {},
+    })
+
+
+def _record(host, latency, status=None):
+    with _stats_lock:
+        stats = _host_stats(host)
+        stats["requests"] += 1
+        stats["latency_total"] += latency
+        stats["latency_max"] = max(stats["latency_max"], latency)
+        stats["latency_last"] = latency
+        if status is None:
+            stats["errors"] += 1
+        else:
+            key = str(status)
+            stats["status_counts"][key] = stats["status_counts"].get(key, 0) + 1
+
+
+def _record_retry(host):
+    with _stats_lock:
+        _host_stats(host)["retries"] += 1
+
+
+def _release_on_close(response, limiter, ticket, status, retry_after):
+    """Keep a streamed response's limiter slot until its body is closed.
+
+    The body is still being transferred from the host after get() returns,
+    so the slot is released by response.close() (or, if the caller never
+    closes it, when the response is garbage collected).
+    """
+    release = weakref.finalize(response, limiter.release, ticket, status, retry_after)
+    close = response.close
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            release()  # a finalizer runs at most once
+
+    response.close = close_and_release
+
+
+def get(url, params=None, headers=None, timeout=None, retries=None, **kwargs) -> "requests.Response":
+    """GET through the shared pool, retrying connection errors and 429/5xx responses.
+
+    Every attempt first waits for the host's rate limiter (see rate_limiter).
+    With ``stream=True`` the host slot is held until the response is closed.
+
+    The returned response carries an ``attempts`` attribute with the number of
+    tries it took. Connection errors on the final attempt are re-raised.
+    """
+    import requests
+    host = urlsplit(url).netloc
+    timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    retries = MAX_RETRIES if retries is None else retries
+    session = get_session()
+
+    limiter = rate_limiter.for_host(host)
+
+    for attempt in range(retries + 1):
+        retry_after = status = None
+        ticket = limiter.acquire()
+        release = True
+        start = time.perf_counter()
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+            status = response.status_code
+        except (requests.ConnectionError, requests.Timeout):
+            _record(host, time.perf_counter() - start)
+            if attempt == retries:
+                raise
+        else:
+            _record(host, time.perf_counter() - start, status)
+            if status in RETRY_STATUSES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if status not in RETRY_STATUSES or attempt == retries:
+                response.attempts = attempt + 1
+                if kwargs.get("stream"):
+                    _release_on_close(response, limiter, ticket, status, retry_after)
+                    release = False
+                return response
+            response.close()
+        finally:
+            if release:
+                limiter.release(ticket, status, retry_after)
+
+        _record_retry(host)
+        time.sleep(backoff_delay(attempt, retry_after))
+
+
+def get_async_client() -> "httpx.AsyncClient":
+    """Return the pooled async client for the running event loop."""
+    import asyncio
+    import httpx  # only the async API path needs it
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=POOL_CONNECTIONS * POOL_MAXSIZE,
+                                max_keepalive_connections=POOL_MAXSIZE),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose():
+    """Close the async client of the running event loop (call at shutdown)."""
+    import asyncio
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def aget(url, params=None, headers=None, timeout=None, retries=None) -> "httpx.Response":
+    """Async counterpart of get(): same retry, backoff and stats behaviour, non-blocking I/O."""
+    import asyncio
+    import httpx
+    host = urlsplit(url).netloc
+    if timeout is None:
+        timeout = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+    elif isinstance(timeout, tuple):
+        timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+    retries = MAX_RETRIES if retries is None else retries
+    client = get_async_client()
+
+    limiter = rate_limiter.for_host(host)
+
+    for attempt in range(retries + 1):
+        retry_after = status = None
+        ticket = await limiter.aacquire()
+        start = time.perf_counter()
+        try:
+            response = await client.get(url, params=params, headers=headers, timeout=timeout)
+            status = response.status_code
+        except (httpx.TransportError, httpx.TimeoutException):
+            _record(host, time.perf_counter() - start)
+            if attempt == retries:
+                raise
+        else:
+            _record(host, time.perf_counter() - start, status)
+            if status in RETRY_STATUSES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if status not in RETRY_STATUSES or attempt == retries:
+                response.attempts = attempt + 1
+                return response
+        finally:
+            limiter.release(ticket, status, retry_after)
+
+        _record_retry(host)
+        await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+
+def get_stats() -> dict:
+    """Per-host request counts, retry counts and latency (seconds)."""
+    with _stats_lock:
+        snapshot = {}
+        for host, stats in _stats.items():
+            entry = dict(stats, status_counts=dict(stats["status_counts"]))
+            entry["latency_avg"] = stats["latency_total"] / stats["requests"] if stats["requests"] else 0.0
+            snapshot[host] = entry
+        return snapshot
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,162 @@
+# job_queue.py
+# Background execution of autonomous runs with progress tracking, cancellation and de-duplication
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import autonomous_agent
+
+JOB_WORKERS = 2      # autonomous runs executing at the same time
+JOB_HISTORY = 100    # finished jobs kept for GET /jobs/{id}
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class Job:
+    def __init__(self, key, topics, workers, hedge_delay=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.topics = topics
+        self.workers = workers
+        self.hedge_delay = hedge_delay
+        self.status = "queued"
+        self.submitted_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.seconds = None
+        self.error = None
+        self.counts = {}
+        self.progress = {}  # topic -> {"status", "seconds", ...}
+        self.cancel_event = threading.Event()
+        self.future = None
+        self._lock = threading.Lock()
+
+    def record(self, topic, status, info):
+        with self._lock:
+            self.progress[topic] = dict(info, status=status)
+
+    def to_dict(self, include_topics=True) -> dict:
+        with self._lock:
+            processed = len(self.progress)
+            failures = {t: p.get("error") for t, p in self.progress.items() if p["status"] == "failed"}
+            data = {
+                "job_id": self.id,
+                "status": self.status,
+                "submitted_at": self.submitted_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "seconds": self.seconds,
+                "total_topics": len(self.topics),
+                "processed_topics": processed,
+                "counts": dict(self.counts),
+                "failures": failures,
+                "error": self.error,
+            }
+            if include_topics:
+                data["topics"] = {t: dict(p) for t, p in self.progress.items()}
+        return data
+
+
+def job_key(topics, workers, hedge_delay=None) -> str:
+    """Identical topic lists (and settings) map to the same key for de-duplication."""
+    payload = json.dumps({"topics": topics, "workers": workers, "hedge_delay": hedge_delay})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def read_topics() -> list:
+    """Topic file contents without the interactive prompt load_topics() falls back to."""
+    if not autonomous_agent.TOPICS_FILE.exists():
+        return []
+    return autonomous_agent.load_topics()
+
+
+class JobManager:
+    """Runs autonomous_run jobs on a bounded pool and keeps their progress queryable."""
+
+    def __init__(self, max_workers=JOB_WORKERS, history=JOB_HISTORY):
+        self.history = history
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="autonomous-job")
+        self._jobs = {}
+        self._active = {}  # key -> job, for de-duplication
+        self._lock = threading.Lock()
+
+    def submit(self, topics=None, workers=autonomous_agent.DEFAULT_WORKERS, hedge_delay=None):
+        """Queue a run; returns (job, created). An identical active job is returned instead."""
+        topics = read_topics() if topics is None else list(topics)
+        key = job_key(topics, workers, hedge_delay)
+        with self._lock:
+            existing = self._active.get(key)
+            if existing is not None:
+                return existing, False
+            job = Job(key, topics, workers, hedge_delay)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self._prune()
+            job.future = self._pool.submit(self._run, job)
+        return job, True
+
+    def _run(self, job: Job):
+        if job.cancel_event.is_set():
+            self._finish(job, "cancelled")
+            return
+        job.status = "running"
+        job.started_at = datetime.now().isoformat()
+        started = time.perf_counter()
+        try:
+            job.counts = autonomous_agent.autonomous_run(
+                workers=job.workers,
+                topics=job.topics,
+                progress=job.record,
+                cancel_event=job.cancel_event,
+                hedge_delay=job.hedge_delay,
+            )
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, "failed", started)
+            return
+        self._finish(job, "cancelled" if job.counts.get("cancelled") else "completed", started)
+
+    def _finish(self, job, status, started=None):
+        with self._lock:
+            job.status = status
+            job.finished_at = datetime.now().isoformat()
+            if started is not None:
+                job.seconds = round(time.perf_counter() - started, 3)
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+
+    def _prune(self):
+        # Drop the oldest finished jobs beyond the history limit
+        finished = [j for j in self._jobs.values() if j.status not in ACTIVE_STATUSES]
+        for job in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_dict(include_topics=False) for job in jobs]
+
+    def cancel(self, job_id):
+        """Request cancellation; the run stops before its next topic. Returns the job or None."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, "cancelled")
+        return job
+
+    def shutdown(self):
+        with self._lock:
+            active = list(self._active.values())
+        for job in active:
+            job.cancel_event.set()
+        self._pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,32 @@
+# json_io.py
+# Small JSON file helpers shared by the agents
+
+import json
+import os
+from pathlib import Path
+
+
+def read_json(path, default=None):
+    """Load a JSON file, returning ``default`` if it does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return {} if default is None else default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json_atomic(path, data, fsync=True) -> int:
+    """Write JSON to a temp file and rename it over ``path`` so readers never see a partial file.
+
+    Returns the number of bytes written.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        size = f.tell()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return size
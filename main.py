@@ -1,16 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from research_agent_stub import generate_digestible_output
+from typing import List, Optional
+from research_agent_stub import generate_digestible_output_async
+from web_search_agent import web_search_summary_async
 from content_generator_agent import generate_content
-from distribution_agent import distribute_summary
 from pathlib import Path
 import json
-from autonomous_agent import autonomous_run
-from pathlib import Path
-import os
+from autonomous_agent import DEFAULT_WORKERS
+from job_queue import JobManager
+import status_snapshot
+import http_client
+import rate_limiter
+import metrics
+from user_stores import UserStoreManager
+
+
+# Hot per-user memory/inbox stores, flushed on a timer and at shutdown
+store_manager = UserStoreManager()
+
+# Autonomous runs execute here in the background; /jobs reports on them
+job_manager = JobManager()
 
+@asynccontextmanager
+async def lifespan(app):
+    store_manager.start()
+    yield
+    job_manager.shutdown()
+    store_manager.stop()
+    await http_client.aclose()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Input structure for research/content generation
 class AgentInput(BaseModel):
@@ -19,6 +40,12 @@ class AgentInput(BaseModel):
     format: str = "educational"  # For content generator
     user: str = "default"
 
+# Optional overrides for an autonomous run (defaults: topic file, DEFAULT_WORKERS, no hedging)
+class AutonomousInput(BaseModel):
+    topics: Optional[List[str]] = None
+    workers: int = DEFAULT_WORKERS
+    hedge_delay: Optional[float] = None  # seconds before the web search races Wikipedia
+
 
 # --- ROUTES ---
 
@@ -26,23 +53,27 @@ class AgentInput(BaseModel):
 
 
 @app.post("/research")
-def run_research(input_data: AgentInput):
+async def run_research(input_data: AgentInput):
+    # Outbound HTTP is awaited on the event loop, so slow upstreams don't pin a worker thread
     try:
-        memory_file = Path(f"research_memory__{input_data.user}.json")
-        inbox_file = Path(f"internal_inbox__{input_data.user}.json")
-
-        result = generate_digestible_output(
-            input_data.topic,
-            input_data.level,
-            memory_file=memory_file  # Pass into agent
-        )
-
-        distribute_summary(
-            input_data.topic,
-            result["summary"],
-            input_data.level,
-            inbox_file=inbox_file
-        )
+        async with store_manager.use_async(input_data.user) as store:
+            metrics.inc("research_requests_total", path="api")
+            result = await generate_digestible_output_async(
+                input_data.topic,
+                input_data.level,
+                memory_file=store.memory  # Cached per-user store
+            )
+
+            if not result.get("summary") or "no summary" in result["summary"].lower():
+                metrics.inc("fallbacks_total", path="api")
+                result = await web_search_summary_async(input_data.topic, input_data.level)
+
+            store_manager.distribute(
+                store,
+                input_data.topic,
+                result["summary"],
+                input_data.level
+            )
 
         return {"summary": result["summary"], "user": input_data.user}
 
@@ -67,47 +98,54 @@ def get_inbox():
     else:
         return {"weekly_digest": {}}
 
-@app.post("/autonomous")
-def run_autonomous_pipeline():
-    try:
-        autonomous_run()
-        return {"status": "Autonomous pipeline executed successfully."}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@app.post("/autonomous", status_code=202)
+def run_autonomous_pipeline(input_data: Optional[AutonomousInput] = None):
+    input_data = input_data or AutonomousInput()
+    job, created = job_manager.submit(input_data.topics, input_data.workers, input_data.hedge_delay)
+    return {"job_id": job.id, "status": job.status, "deduplicated": not created}
+
+@app.get("/jobs")
+def list_jobs():
+    return {"jobs": job_manager.list()}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/stores")
+def get_store_stats():
+    return store_manager.stats()
+
+@app.get("/outbound")
+def get_outbound_stats():
+    # Per-host request stats and the rate limiter's current limits
+    return {"hosts": http_client.get_stats(), "limits": rate_limiter.get_state()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
 
 @app.get("/status")
 def get_system_status():
-    status = {}
-
-    # Check autonomous log
-    log_file = Path("autonomous_log.json")
-    if log_file.exists():
-        with open(log_file, "r", encoding="utf-8") as f:
-            logs = json.load(f)
-            status["last_run"] = logs[-1]["timestamp"] if logs else "Never"
-            status["evaluated_topics"] = len(logs)
-    else:
-        status["last_run"] = "Never"
-        status["evaluated_topics"] = 0
-
-    # Check research memory
-    memory_file = Path("research_memory.json")
-    if memory_file.exists():
-        with open(memory_file, "r", encoding="utf-8") as f:
-            memory = json.load(f)
-            status["memory_entries"] = len(memory)
-    else:
-        status["memory_entries"] = 0
-
-    # Check inbox
-    inbox_file = Path("internal_inbox.json")
-    if inbox_file.exists():
-        with open(inbox_file, "r", encoding="utf-8") as f:
-            inbox = json.load(f)
-            digest = inbox.get("weekly_digest", {})
-            total = sum(len(v) for k, v in digest.items() if isinstance(v, list))
-            status["inbox_items"] = total
-    else:
-        status["inbox_items"] = 0
-
-    return status
+    # Counters are maintained by the agents as they write; nothing is scanned here
+    snapshot = status_snapshot.load()
+    inbox_by_level = snapshot["inbox_items"].get("internal_inbox.json", {})
+    return {
+        "last_run": snapshot["last_run"] or "Never",
+        "evaluated_topics": snapshot["evaluated_topics"],
+        "memory_entries": snapshot["memory_entries"].get("research_memory.json", 0),
+        "inbox_items": sum(inbox_by_level.values()),
+        "inbox_by_level": inbox_by_level,
+        "updated_at": snapshot["updated_at"],
+    }
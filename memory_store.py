@@ -0,0 +1,366 @@
+# memory_store.py
+# Pluggable research memory backends: indexed SQLite (default) or the legacy JSON file
+
+import json
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import status_snapshot
+
+MEMORY_FILE = Path("research_memory.json")
+DEFAULT_BACKEND = os.environ.get("MEMORY_BACKEND", "sqlite")
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class MemoryStore:
+    """Topic -> record mapping shared by all agents.
+
+    Records are plain dicts as the agents produce them. Subclasses implement
+    get/upsert_many/delete/items/by_level/since/count/transaction; the mapping
+    helpers below let callers keep treating memory like the old dict.
+    """
+
+    def get(self, topic, default=None):
+        raise NotImplementedError
+
+    def upsert(self, topic, record):
+        self.upsert_many({topic: record})
+
+    def upsert_many(self, records: dict):
+        raise NotImplementedError
+
+    def delete(self, topic):
+        raise NotImplementedError
+
+    def items(self):
+        raise NotImplementedError
+
+    def by_level(self, level):
+        raise NotImplementedError
+
+    def since(self, timestamp):
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    @contextmanager
+    def transaction(self):
+        raise NotImplementedError
+        yield
+
+    def close(self):
+        """Release open handles; the store must not be used afterwards."""
+
+    def keys(self):
+        return [topic for topic, _ in self.items()]
+
+    def __len__(self):
+        return self.count()
+
+    def __contains__(self, topic):
+        return self.get(topic) is not None
+
+    def __getitem__(self, topic):
+        record = self.get(topic)
+        if record is None:
+            raise KeyError(topic)
+        return record
+
+    def __setitem__(self, topic, record):
+        self.upsert(topic, record)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+
+def _record_timestamp(record):
+    return record.get("timestamp") or datetime.now().isoformat()
+
+
+class _ConnectionOwner:
+    """Stands for one thread's connection in that thread's locals (see SQLiteMemoryStore._conn)."""
+
+
+def _release_connection(conn, conns, lock):
+    with lock:
+        conns.discard(conn)
+    conn.close()
+
+
+class SQLiteMemoryStore(MemoryStore):
+    """SQLite store in WAL mode: O(1) upsert/get by topic, indexed level and timestamp lookups."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._conns = set()  # every live thread's connection, so close() can reach them all
+        self._conns_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory ("
+            " topic TEXT PRIMARY KEY, level TEXT, timestamp TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS memory_level ON memory (level, timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS memory_timestamp ON memory (timestamp)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        # Entry count maintained by triggers so count() never scans the table
+        with self.transaction():
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('entries', (SELECT COUNT(*) FROM memory))"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS memory_count_insert AFTER INSERT ON memory BEGIN"
+                " UPDATE meta SET value = value + 1 WHERE key = 'entries'; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS memory_count_delete AFTER DELETE ON memory BEGIN"
+                " UPDATE meta SET value = value - 1 WHERE key = 'entries'; END"
+            )
+        self._local.changed = False
+
+    def _conn(self):
+        # One connection per thread; WAL lets readers run alongside a writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Still used by one thread only; close() may run on another
+            conn = sqlite3.connect(str(self.path), isolation_level=None, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conns_lock:
+                self._conns.add(conn)
+            # The owner is referenced only from this thread's locals, so it is
+            # collected when the thread ends and its finalizer closes the connection
+            self._local.owner = _ConnectionOwner()
+            weakref.finalize(self._local.owner, _release_connection, conn, self._conns, self._conns_lock)
+            self._local.conn = conn
+            self._local.depth = 0
+            self._local.changed = False
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self._conn()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield self
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield self
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+            if self._local.changed:
+                status_snapshot.record_memory(self.path.with_suffix(".json"), self.count())
+        finally:
+            self._local.depth = 0
+            self._local.changed = False
+
+    def get(self, topic, default=None):
+        row = self._conn().execute("SELECT data FROM memory WHERE topic = ?", (topic,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def upsert_many(self, records: dict):
+        rows = [
+            (topic, record.get("level"), _record_timestamp(record), json.dumps(record))
+            for topic, record in records.items()
+        ]
+        with self.transaction():
+            self._local.changed = True
+            self._conn().executemany(
+                "INSERT INTO memory (topic, level, timestamp, data) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(topic) DO UPDATE SET"
+                " level = excluded.level, timestamp = excluded.timestamp, data = excluded.data",
+                rows,
+            )
+
+    def delete(self, topic):
+        with self.transaction():
+            self._local.changed = True
+            self._conn().execute("DELETE FROM memory WHERE topic = ?", (topic,))
+
+    def items(self):
+        rows = self._conn().execute("SELECT topic, data FROM memory ORDER BY rowid").fetchall()
+        return [(topic, json.loads(data)) for topic, data in rows]
+
+    def by_level(self, level):
+        rows = self._conn().execute(
+            "SELECT topic, data FROM memory WHERE level = ? ORDER BY timestamp", (level,)
+        ).fetchall()
+        return [(topic, json.loads(data)) for topic, data in rows]
+
+    def since(self, timestamp):
+        rows = self._conn().execute(
+            "SELECT topic, data FROM memory WHERE timestamp >= ? ORDER BY timestamp", (timestamp,)
+        ).fetchall()
+        return [(topic, json.loads(data)) for topic, data in rows]
+
+    def count(self) -> int:
+        return int(self.get_meta("entries", 0))
+
+    def get_meta(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.transaction():
+            self._conn().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        with self._conns_lock:
+            conns = list(self._conns)
+            self._conns.clear()
+        # Outside the lock: dropping the locals runs this thread's finalizer
+        self._local = threading.local()
+        for conn in conns:
+            conn.close()
+
+
+class JSONMemoryStore(MemoryStore):
+    """Legacy backend: the whole memory dict in one JSON file, rewritten on each commit."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            if self.path.exists():
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            else:
+                self._data = {}
+        return self._data
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self._load()
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._data = None  # drop uncommitted changes
+                raise
+            finally:
+                self._depth -= 1
+            if self._depth == 0:
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, indent=2)
+                status_snapshot.record_memory(self.path, len(self._data))
+
+    def get(self, topic, default=None):
+        with self._lock:
+            return self._load().get(topic, default)
+
+    def upsert_many(self, records: dict):
+        with self.transaction():
+            self._data.update(records)
+
+    def delete(self, topic):
+        with self.transaction():
+            self._data.pop(topic, None)
+
+    def items(self):
+        with self._lock:
+            return list(self._load().items())
+
+    def by_level(self, level):
+        matches = [(t, r) for t, r in self.items() if r.get("level") == level]
+        return sorted(matches, key=lambda item: item[1].get("timestamp", ""))
+
+    def since(self, timestamp):
+        matches = [(t, r) for t, r in self.items() if r.get("timestamp", "") >= timestamp]
+        return sorted(matches, key=lambda item: item[1]["timestamp"])
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+
+def migrate_json_memory(json_file, store: SQLiteMemoryStore) -> int:
+    """One-shot import of a legacy research_memory*.json file into a SQLite store.
+
+    The migration is recorded in the store, so calling this again is a no-op.
+    Returns the number of records imported.
+    """
+    json_file = Path(json_file)
+    marker = f"migrated:{json_file.name}"
+    if not json_file.exists() or store.get_meta(marker):
+        return 0
+    with open(json_file, "r", encoding="utf-8") as f:
+        legacy = json.load(f)
+    with store.transaction():
+        # Keep anything written to the store before the migration ran
+        store.upsert_many({t: r for t, r in legacy.items() if store.get(t) is None})
+        store.set_meta(marker, datetime.now().isoformat())
+    print(f"[🗄️] Migrated {len(legacy)} memory entries from {json_file}")
+    return len(legacy)
+
+
+def _store_key(memory_file, backend):
+    return (backend, str(Path(memory_file).resolve()))
+
+
+def open_memory_store(memory_file=None, backend=None) -> MemoryStore:
+    """Return the shared store for a memory file path (one instance per path).
+
+    ``memory_file`` keeps its historical .json name; the SQLite backend stores
+    data next to it with a .sqlite3 suffix and migrates the JSON file on first open.
+    Passing an existing MemoryStore returns it unchanged.
+    """
+    if isinstance(memory_file, MemoryStore):
+        return memory_file
+    memory_file = Path(memory_file or MEMORY_FILE)
+    backend = backend or DEFAULT_BACKEND
+    key = _store_key(memory_file, backend)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if backend == "json":
+                store = JSONMemoryStore(memory_file)
+            elif backend == "sqlite":
+                store = SQLiteMemoryStore(memory_file.with_suffix(".sqlite3"))
+                migrate_json_memory(memory_file, store)
+            else:
+                raise ValueError(f"Unknown memory backend: {backend}")
+            _stores[key] = store
+    return store
+
+
+def close_memory_store(memory_file=None, backend=None):
+    """Forget the shared store for a memory file path and close its connections.
+
+    The next open_memory_store() for the path opens a new instance.
+    """
+    memory_file = Path(memory_file or MEMORY_FILE)
+    with _stores_lock:
+        store = _stores.pop(_store_key(memory_file, backend or DEFAULT_BACKEND), None)
+    if store is not None:
+        store.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    files = sys.argv[1:] or [str(p) for p in Path(".").glob("research_memory*.json")]
+    for name in files:
+        store = open_memory_store(Path(name), backend="sqlite")
+        print(f"{name} -> {store.path} ({store.count()} entries)")
+
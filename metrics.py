@@ -0,0 +1,188 @@
+# metrics.py
+# In-process counters and stage timers with Prometheus text export and per-run summaries
+
+import os
+import threading
+import time
+
+PREFIX = "agent_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# METRICS_ENABLED=0 turns every call below into an early return
+_enabled = os.environ.get("METRICS_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+_help = {
+    "stage_seconds": "Time spent in each pipeline stage.",
+    "pipeline_stage_seconds": "Time spent in each stage of an orchestrator pipeline.",
+    "topics_total": "Autonomous topics processed, by outcome.",
+    "research_requests_total": "Topic lookups that started with Wikipedia, by entry point.",
+    "fallbacks_total": "Lookups that fell back to web search, by entry point.",
+    "wikipedia_lookups_total": "Single-title Wikipedia lookups, by result.",
+    "web_search_total": "Web search fallbacks, by result.",
+    "hedged_wins_total": "Hedged lookups, by the source whose result was used.",
+    "cache_lookups_total": "Response cache lookups, by result.",
+    "bytes_written_total": "Bytes written to JSON output files, by target.",
+    "rate_limit_wait_seconds": "Time outbound requests waited for their host's rate limiter.",
+    "rate_limit_throttled_total": "Throttling responses (429/503) seen by the rate limiter, by host.",
+}
+
+
+def configure(enabled=True):
+    global _enabled
+    _enabled = enabled
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0] * (len(DEFAULT_BUCKETS) + 2)
+        for i, bound in enumerate(DEFAULT_BUCKETS):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(stage, name="stage_seconds", **labels):
+    """Context manager recording the elapsed time of ``stage`` in a histogram."""
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name, dict(labels, stage=stage))
+
+
+def _series_name(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+def snapshot() -> dict:
+    """Point-in-time copy: {"counters": {series: value}, "timers": {series: {count, seconds}}}."""
+    with _lock:
+        counters = {_series_name(n, l): v for (n, l), v in _counters.items()}
+        timers = {
+            _series_name(n, l): {"count": s[-1], "seconds": s[-2]}
+            for (n, l), s in _histograms.items()
+        }
+    return {"counters": counters, "timers": timers}
+
+
+def summarize(before: dict, after: dict = None) -> dict:
+    """Difference between two snapshots, e.g. the activity of one run.
+
+    Other work in the same process (API requests) during the run is included.
+    """
+    after = after or snapshot()
+    counters = {}
+    for series, value in after["counters"].items():
+        delta = value - before["counters"].get(series, 0)
+        if delta:
+            counters[series] = delta
+    timers = {}
+    for series, data in after["timers"].items():
+        previous = before["timers"].get(series, {"count": 0, "seconds": 0.0})
+        count = data["count"] - previous["count"]
+        if count:
+            seconds = data["seconds"] - previous["seconds"]
+            timers[series] = {
+                "count": count,
+                "seconds": round(seconds, 4),
+                "avg_ms": round(seconds / count * 1000, 3),
+            }
+    return {"counters": counters, "timers": timers}
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render_prometheus() -> str:
+    """All series in the Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((k, list(v)) for k, v in _histograms.items())
+
+    lines = []
+    declared = set()
+
+    def declare(name, kind):
+        if name not in declared:
+            declared.add(name)
+            if name in _help:
+                lines.append(f"# HELP {PREFIX}{name} {_help[name]}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+    for (name, labels), value in counters:
+        declare(name, "counter")
+        lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), series in histograms:
+        declare(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(DEFAULT_BUCKETS, series):
+            cumulative += count
+            lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {series[-1]}")
+        lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {series[-2]}")
+        lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {series[-1]}")
+
+    return "\n".join(lines) + "\n"
@@ -1,41 +1,122 @@
 # orchestrator_agent.py
-# Controls workflow between Research Agent and Content Generator Agent
+# Controls workflow between the agents as in-process pipelines
 
-import subprocess
 from pathlib import Path
-import json
+
+import content_generator_agent
+import distribution_agent
+import evaluator_agent
+import research_agent_stub
+import web_search_agent
+from json_io import read_json
+from memory_store import open_memory_store
+from pipeline import Pipeline, StopPipeline
 
 MEMORY_FILE = Path("research_memory.json")
+INBOX_FILE = Path("internal_inbox.json")
 
 # --- Helper Functions ---
 
-def run_research_agent():
+def check_memory_exists():
+    return open_memory_store(MEMORY_FILE).count() > 0
+
+def list_topics():
+    return open_memory_store(MEMORY_FILE).keys()
+
+# --- Stages (each receives the run inputs plus upstream results by stage name) ---
+
+def ask_research_request(context):
+    topic = input("Enter a topic to research: ").strip()
+    if not topic:
+        raise StopPipeline("No topic entered.")
+    level = input("Enter your skill level (novice/intermediate/advanced): ").strip().lower() or "novice"
+    request = {"topic": topic, "level": level}
+    if context.get("with_content"):
+        request["format"] = input("Enter content format (educational/linkedin_post): ").strip() or "educational"
+    return request
+
+def research_stage(context):
+    request = context["ask"]
     print("\n[🧠 Running Research Agent...]")
-    subprocess.run(["python", "research_agent_stub.py"])
+    output = research_agent_stub.generate_digestible_output(request["topic"], request["level"])
+    if "no summary" in output["summary"].lower():
+        raise StopPipeline(f"No summary found for '{request['topic']}'.")
+    return research_agent_stub.as_topic_data(request["topic"], request["level"], output)
 
-def run_content_generator():
-    print("\n[✍️  Running Content Generator Agent...]")
-    subprocess.run(["python", "content_generator_agent.py"])
+def show_research(context):
+    print("\n--- Research Agent Output ---")
+    research_agent_stub.print_output(context["research"])
 
-def run_web_search_agent():
-    print("\n[🌐 Running Web Search Agent...]")
-    subprocess.run(["python", "web_search_agent.py"])
+def content_stage(context):
+    return content_generator_agent.generate_content(context["research"], context["ask"]["format"])
 
-def run_evaluator_agent():
-    print("\n[📊 Running Evaluator Agent...]")
-    subprocess.run(["python", "evaluator_agent.py"])
+def evaluate_stage(context):
+    topic_data = context["research"]
+    evaluation = evaluator_agent.evaluate_summary(topic_data)
+    evaluation["Summary Hash"] = evaluator_agent.summary_hash(topic_data)
+    evaluator_agent.save_evaluation(topic_data["topic"], evaluation, topic_data["level"])
+    return evaluation
 
-def run_distribution_agent():
-    print("\n[📤 Running Distribution Agent...]")
-    subprocess.run(["python", "distribution_agent.py"])
+def distribute_stage(context):
+    topic_data = context["research"]
+    distribution_agent.distribute_summary(topic_data["topic"], topic_data["summary"], topic_data["level"])
 
-def check_memory_exists():
-    return MEMORY_FILE.exists() and MEMORY_FILE.stat().st_size > 0
+def show_full_pipeline(context):
+    show_research(context)
+    print("\n--- Generated Content ---\n")
+    print(context["content"])
+    evaluator_agent.print_evaluation(context["research"]["topic"], context["evaluate"])
 
-def list_topics():
-    with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-        memory = json.load(f)
-    return list(memory.keys())
+def require_memory(context):
+    if not check_memory_exists():
+        raise StopPipeline("No research memory found. Please run the Research Agent first.")
+
+def show_weekly_digest(context):
+    digest = read_json(INBOX_FILE, {}).get("weekly_digest", {})
+    if not digest:
+        print("\n[📭 Inbox is empty]")
+        return
+    print("\n[📬 Weekly Digest]")
+    for level, items in digest.items():
+        print(f"\n{level.title()} ({len(items)} items)")
+        for item in items[-10:]:
+            print(f"- [{item.get('priority', '')}] {item['topic']}: {item.get('guidance', '')}")
+
+# --- Workflows ---
+
+def research_workflow():
+    return (Pipeline("research")
+            .add("ask", ask_research_request)
+            .add("research", research_stage, after=["ask"])
+            .add("show", show_research, after=["research"]))
+
+def content_workflow():
+    return (Pipeline("content")
+            .add("check_memory", require_memory)
+            .add("content", lambda context: content_generator_agent.main(), after=["check_memory"]))
+
+def full_workflow():
+    # Content, evaluation and distribution only need the research output, so they run side by side
+    return (Pipeline("full")
+            .add("ask", ask_research_request)
+            .add("research", research_stage, after=["ask"])
+            .add("content", content_stage, after=["research"])
+            .add("evaluate", evaluate_stage, after=["research"])
+            .add("distribute", distribute_stage, after=["research"])
+            .add("show", show_full_pipeline, after=["content", "evaluate", "distribute"]))
+
+def single_stage_workflow(name, func):
+    return lambda: Pipeline(name).add(name, lambda context: func())
+
+WORKFLOWS = {
+    "1": (research_workflow, {}),
+    "2": (content_workflow, {}),
+    "3": (full_workflow, {"with_content": True}),
+    "4": (single_stage_workflow("web_search", web_search_agent.main), {}),
+    "5": (single_stage_workflow("evaluate", lambda: evaluator_agent.main([])), {}),
+    "6": (single_stage_workflow("distribute", distribution_agent.main), {}),
+    "7": (lambda: Pipeline("digest").add("digest", show_weekly_digest), {}),
+}
 
 def main():
     print("""
@@ -43,7 +124,7 @@ def main():
 Choose a workflow:
 1. Run Research Agent only (Wikipedia)
 2. Run Content Generator only
-3. Full pipeline: Research → Content
+3. Full pipeline: Research → Content + Evaluation + Distribution
 4. Run Web Search Agent
 5. Run Evaluator Agent
 6. Run Distribution Agent
@@ -54,24 +135,11 @@ Choose a workflow:
 
     choice = input("Enter option number: ").strip()
 
-    if choice == "1":
-        run_research_agent()
-    elif choice == "2":
-        if not check_memory_exists():
-            print("[⚠️  No research memory found. Please run the Research Agent first.]")
-        else:
-            run_content_generator()
-    elif choice == "3":
-        run_research_agent()
-        run_content_generator()
-    elif choice == "4":
-        run_web_search_agent()
-    elif choice == "5":
-        run_evaluator_agent()
-    elif choice == "6":
-        run_distribution_agent()
-    elif choice == "7":
+    if choice == "8":
         print("Exiting orchestrator.")
+    elif choice in WORKFLOWS:
+        build, inputs = WORKFLOWS[choice]
+        build().run(**inputs)
     else:
         print("Invalid choice.")
 
@@ -0,0 +1,129 @@
+# pipeline.py
+# In-process DAG executor: agents run as stages, results pass in memory, independent stages run concurrently
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import metrics
+
+DEFAULT_WORKERS = 4
+
+
+class StopPipeline(Exception):
+    """Raised by a stage to end the run early without it counting as a failure."""
+
+
+class Stage:
+    def __init__(self, name, func, after=()):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+
+
+class PipelineRun:
+    """Outcome of one run: stage results, per-stage status and timings."""
+
+    def __init__(self, name):
+        self.name = name
+        self.results = {}
+        self.stages = {}  # name -> {"status", "seconds", "error"}
+        self.seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(info["status"] == "done" for info in self.stages.values())
+
+    def report(self) -> str:
+        lines = [f"[⏱️] Pipeline '{self.name}' finished in {self.seconds * 1000:.1f} ms"]
+        for name, info in self.stages.items():
+            detail = f"  {info['error']}" if info.get("error") else ""
+            lines.append(f"    {name:<20}{info['status']:<9}{info['seconds'] * 1000:>10.1f} ms{detail}")
+        return "\n".join(lines)
+
+
+class Pipeline:
+    """A named graph of stages. Each stage function receives one dict holding the
+    run inputs plus the return value of every upstream stage, keyed by stage name.
+    """
+
+    def __init__(self, name, max_workers=DEFAULT_WORKERS):
+        self.name = name
+        self.max_workers = max_workers
+        self.stages = {}
+
+    def add(self, name, func, after=()):
+        """Add a stage that runs once every stage in ``after`` is done. Returns the pipeline."""
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [dep for dep in after if dep not in self.stages]
+        if missing:
+            # Dependencies must be declared first, which also rules out cycles
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {', '.join(missing)}")
+        self.stages[name] = Stage(name, func, after)
+        return self
+
+    def _ancestors(self, name):
+        seen, stack = set(), list(self.stages[name].after)
+        while stack:
+            dep = stack.pop()
+            if dep not in seen:
+                seen.add(dep)
+                stack.extend(self.stages[dep].after)
+        return seen
+
+    def run(self, verbose=True, **inputs) -> PipelineRun:
+        run = PipelineRun(self.name)
+        for name in self.stages:
+            run.stages[name] = {"status": "pending", "seconds": 0.0, "error": None}
+        ancestors = {name: self._ancestors(name) for name in self.stages}
+        lock = threading.Lock()
+        started = time.perf_counter()
+
+        def execute(stage):
+            with lock:
+                context = dict(inputs)
+                context.update({dep: run.results[dep] for dep in ancestors[stage.name]})
+            stage_started = time.perf_counter()
+            try:
+                value = stage.func(context)
+                status, error = "done", None
+            except StopPipeline as e:
+                value, status, error = None, "stopped", str(e) or None
+            except Exception as e:
+                value, status, error = None, "failed", f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - stage_started
+            metrics.observe("pipeline_stage_seconds", elapsed, pipeline=self.name, stage=stage.name)
+            with lock:
+                run.results[stage.name] = value
+                run.stages[stage.name].update(status=status, seconds=round(elapsed, 4), error=error)
+
+        pending = dict(self.stages)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"pipeline-{self.name}") as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    states = [run.stages[dep]["status"] for dep in stage.after]
+                    if any(s in ("failed", "stopped", "skipped") for s in states):
+                        run.stages[name]["status"] = "skipped"
+                        del pending[name]
+                    elif all(s == "done" for s in states):
+                        run.stages[name]["status"] = "running"
+                        running[pool.submit(execute, stage)] = name
+                        del pending[name]
+                if not running:
+                    continue  # only skips happened this pass; re-check what they unblocked
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+                    del running[future]
+
+        run.seconds = time.perf_counter() - started
+        if verbose:
+            for name, info in run.stages.items():
+                if info["status"] == "failed":
+                    print(f"[⚠️] Stage '{name}' failed: {info['error']}")
+                elif info["status"] == "stopped" and info["error"]:
+                    print(f"[⚠️] {info['error']}")
+            print(run.report())
+        return run
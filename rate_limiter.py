@@ -0,0 +1,185 @@
+# rate_limiter.py
+# Per-host token bucket with AIMD concurrency control, shared by all outbound HTTP callers
+
+import threading
+import time
+
+import metrics
+
+# Defaults for hosts without an entry in HOST_LIMITS
+DEFAULT_RATE = 10.0          # requests per second refilled into the bucket
+DEFAULT_BURST = 10           # bucket size
+DEFAULT_CONCURRENCY = 4      # starting in-flight limit
+DEFAULT_MAX_CONCURRENCY = 32
+MIN_CONCURRENCY = 1
+DECREASE_FACTOR = 0.5        # multiplicative decrease on a throttling response
+THROTTLE_STATUSES = frozenset({429, 503})
+POLL_INTERVAL = 0.05         # async waiters re-check a full host this often
+
+# Per-host overrides: {host: {"rate", "burst", "concurrency", "max_concurrency"}}
+HOST_LIMITS = {
+    "en.wikipedia.org": {"rate": 50.0, "burst": 50, "concurrency": 8},
+    "duckduckgo.com": {"rate": 1.0, "burst": 3, "concurrency": 2, "max_concurrency": 4},
+    "html.duckduckgo.com": {"rate": 1.0, "burst": 3, "concurrency": 2, "max_concurrency": 4},
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class HostLimiter:
+    """Token bucket (request rate) plus an additive-increase/multiplicative-decrease
+    limit on requests in flight.
+
+    Every success while the limit is in use raises it by 1/limit (about +1 per
+    round of requests); a 429/503 halves it and a Retry-After pauses the host
+    for all callers until it expires. Throttles from requests that started
+    before the last decrease are not counted again, so one overload halves
+    the limit once.
+    """
+
+    def __init__(self, host, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 concurrency=DEFAULT_CONCURRENCY, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.host = host
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_concurrency = max(max_concurrency, MIN_CONCURRENCY)
+        self.limit = float(min(max(concurrency, MIN_CONCURRENCY), self.max_concurrency))
+        self.tokens = self.burst
+        self.in_flight = 0
+        self.waiting = 0
+        self.blocked_until = 0.0
+        self.counters = {"acquired": 0, "waited": 0, "throttled": 0, "wait_seconds": 0.0}
+        self._updated = time.monotonic()
+        self._tickets = 0
+        self._decrease_ticket = 0  # requests acquired before this already saw the last decrease
+        self._cond = threading.Condition(threading.Lock())
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_acquire(self):
+        """Take a token and a slot; returns 0.0 on success, else seconds to wait (None = until a release)."""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.in_flight >= int(self.limit):
+            return None
+        self._refill(now)
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        self.tokens -= 1
+        self.in_flight += 1
+        self.counters["acquired"] += 1
+        self._tickets += 1
+        return 0.0
+
+    def _waited(self, started):
+        if started is not None:
+            waited = time.monotonic() - started
+            self.counters["waited"] += 1
+            self.counters["wait_seconds"] += waited
+            metrics.observe("rate_limit_wait_seconds", waited, host=self.host)
+
+    def acquire(self) -> int:
+        """Block until a request to this host may start; returns the ticket to pass to release()."""
+        started = None
+        with self._cond:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0.0:
+                    self._waited(started)
+                    return self._tickets
+                if started is None:
+                    started = time.monotonic()
+                self.waiting += 1
+                self._cond.wait(wait)
+                self.waiting -= 1
+
+    async def aacquire(self) -> int:
+        """Async acquire(): sleeps on the event loop instead of blocking it."""
+        import asyncio
+        started = None
+        while True:
+            with self._cond:
+                wait = self._try_acquire()
+                if wait == 0.0:
+                    self._waited(started)
+                    return self._tickets
+                if started is None:
+                    started = time.monotonic()
+                self.waiting += 1
+            try:
+                await asyncio.sleep(POLL_INTERVAL if wait is None else min(wait, 1.0))
+            finally:
+                with self._cond:
+                    self.waiting -= 1
+
+    def release(self, ticket, status=None, retry_after=None):
+        """Finish the request holding ``ticket``. ``status`` is None for
+        connection errors, which leave the limit unchanged.
+        """
+        with self._cond:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight = max(self.in_flight - 1, 0)
+            now = time.monotonic()
+            if status in THROTTLE_STATUSES:
+                self.counters["throttled"] += 1
+                if ticket > self._decrease_ticket:
+                    self.limit = max(MIN_CONCURRENCY, self.limit * DECREASE_FACTOR)
+                    self._decrease_ticket = self._tickets
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, now + retry_after)
+                    self.tokens = 0.0
+                    self._updated = now
+                metrics.inc("rate_limit_throttled_total", host=self.host)
+            elif status is not None and status < 500 and saturated:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def state(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "tokens": round(self.tokens, 2),
+                "concurrency_limit": round(self.limit, 2),
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "blocked_for": round(max(self.blocked_until - now, 0.0), 3),
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.counters.items()},
+            }
+
+
+def for_host(host) -> HostLimiter:
+    """Shared limiter for ``host``, created from HOST_LIMITS (or the defaults) on first use."""
+    limiter = _limiters.get(host)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(host)
+            if limiter is None:
+                limiter = _limiters[host] = HostLimiter(host, **HOST_LIMITS.get(host, {}))
+    return limiter
+
+
+def configure(host, **limits):
+    """Set rate/burst/concurrency/max_concurrency for ``host``; its limiter restarts with them."""
+    with _limiters_lock:
+        HOST_LIMITS[host] = dict(HOST_LIMITS.get(host, {}), **limits)
+        _limiters.pop(host, None)
+
+
+def get_state() -> dict:
+    """Per-host limiter state for monitoring."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {host: limiter.state() for host, limiter in sorted(limiters.items())}
+
+
+def reset():
+    with _limiters_lock:
+        _limiters.clear()
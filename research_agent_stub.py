@@ -1,29 +1,139 @@
 # research_agent_stub.py
 # Research Agent with skill-aware prompting and local memory storage
 
-import requests
 import json
 import os
 from pathlib import Path
 
-MEMORY_FILE = None
+import http_client
+import metrics
+import response_cache
+from memory_store import open_memory_store
 
-# Load or initialize memory
-if MEMORY_FILE.exists():
-    with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-        memory = json.load(f)
-else:
-    memory = {}
+MEMORY_FILE = Path("research_memory.json")
+# Base URL of the Wikipedia REST and query APIs (override to point at a mirror or a local stub)
+WIKIPEDIA_URL = os.environ.get("WIKIPEDIA_URL", "https://en.wikipedia.org").rstrip("/")
+BATCH_SIZE = 50  # MediaWiki caps titles per query at 50
 
 def get_wikipedia_summary(topic: str) -> str:
-    """Fetch a concise summary from Wikipedia for the given topic."""
-    url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{topic.replace(' ', '_')}"
-    response = requests.get(url)
+    """Fetch a concise summary from Wikipedia for the given topic.
+
+    Responses are kept in the shared response cache: fresh entries skip the
+    network entirely, stale ones are revalidated with a conditional request.
+    """
+    cache = response_cache.get_cache()
+    key = response_cache.normalize_key(topic)
+    cached = cache.get(key)
+    if cached and cached["fresh"]:
+        return json.loads(cached["body"]).get("extract", "No summary found.")
+
+    with metrics.timer("wikipedia_fetch"):
+        response = http_client.get(_summary_url(topic), headers=response_cache.conditional_headers(cached))
+    return _read_summary_response(response, cache, key, cached)
+
+async def get_wikipedia_summary_async(topic: str) -> str:
+    """Async variant of get_wikipedia_summary (same cache, non-blocking HTTP).
+
+    Cache reads and writes are SQLite calls, so they run in worker threads.
+    """
+    import asyncio
+    cache = response_cache.get_cache()
+    key = response_cache.normalize_key(topic)
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached and cached["fresh"]:
+        return json.loads(cached["body"]).get("extract", "No summary found.")
+
+    with metrics.timer("wikipedia_fetch"):
+        response = await http_client.aget(_summary_url(topic), headers=response_cache.conditional_headers(cached))
+    return await asyncio.to_thread(_read_summary_response, response, cache, key, cached)
+
+def _summary_url(topic: str) -> str:
+    return f"{WIKIPEDIA_URL}/api/rest_v1/page/summary/{topic.replace(' ', '_')}"
+
+def _read_summary_response(response, cache, key, cached) -> str:
+    if response.status_code == 304 and cached:
+        cache.revalidated(key)
+        return json.loads(cached["body"]).get("extract", "No summary found.")
     if response.status_code == 200:
+        cache.put(key, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
         data = response.json()
         return data.get("extract", "No summary found.")
     return "Failed to retrieve summary."
 
+def _fetch_extract_batch(titles: list) -> dict:
+    """Resolve up to BATCH_SIZE titles in one query, following redirects and continuations."""
+    params = {
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "prop": "extracts",
+        "exintro": "1",
+        "explaintext": "1",
+        "exlimit": "max",
+        "redirects": "1",
+        "titles": "|".join(titles),
+    }
+    normalized, redirects, extracts = {}, {}, {}
+    continuation = {}
+    while True:
+        response = http_client.get(f"{WIKIPEDIA_URL}/w/api.php", params={**params, **continuation})
+        if response.status_code != 200:
+            break
+        data = response.json()
+        query = data.get("query", {})
+        for item in query.get("normalized", []):
+            normalized[item["from"]] = item["to"]
+        for item in query.get("redirects", []):
+            redirects[item["from"]] = item["to"]
+        for page in query.get("pages", []):
+            if page.get("extract"):
+                extracts[page["title"]] = page["extract"]
+        # Extracts are capped per response, so large batches arrive in a few continuations
+        if "continue" not in data:
+            break
+        continuation = data["continue"]
+
+    resolved = {}
+    for title in titles:
+        canonical = normalized.get(title, title)
+        canonical = redirects.get(canonical, canonical)
+        if extracts.get(canonical):
+            resolved[title] = extracts[canonical]
+    return resolved
+
+def get_wikipedia_summaries(topics: list, batch_size: int = BATCH_SIZE) -> dict:
+    """Fetch extracts for many topics, batch_size titles per request.
+
+    Returns {topic: extract} for the topics that resolved. Fresh cache entries
+    are used as-is and new extracts are written back to the response cache.
+    """
+    import requests
+    cache = response_cache.get_cache()
+    resolved, pending = {}, []
+    for topic in dict.fromkeys(topics):
+        cached = cache.get(response_cache.normalize_key(topic))
+        if cached and cached["fresh"]:
+            extract = json.loads(cached["body"]).get("extract")
+            if extract:
+                resolved[topic] = extract
+                continue
+        # "|" separates titles in the query API, so those topics go through the single path
+        if "|" not in topic and topic.strip():
+            pending.append(topic)
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        try:
+            with metrics.timer("wikipedia_batch"):
+                fetched = _fetch_extract_batch(batch)
+        except requests.RequestException as e:
+            print(f"[⚠️] Wikipedia batch request failed: {e}")
+            continue
+        for topic, extract in fetched.items():
+            cache.put(response_cache.normalize_key(topic), json.dumps({"extract": extract}))
+        resolved.update(fetched)
+    return resolved
+
 def extract_glossary_terms(summary: str, num_terms: int = 3) -> list:
     """Very basic glossary term extractor using keyword heuristics."""
     import re
@@ -58,43 +168,102 @@ from pathlib import Path
 import json
 from datetime import datetime
 
-def generate_digestible_output(topic, level="novice", memory_file=None):
+def build_digestible_output(extract: str, level: str) -> dict:
+    """Turn a raw extract into the skill-aware summary shape returned to callers."""
+    return {
+        "summary": apply_skill_level_tone(extract, level),
+        "glossary": extract_glossary_terms(extract) if level == "novice" else [],
+        "source": "wikipedia"
+    }
+
+def save_to_memory(outputs: dict, level: str, memory_file):
+    """Record {topic: output} in the memory store in one transaction."""
+    timestamp = datetime.now().isoformat()
+    with metrics.timer("memory_write"):
+        open_memory_store(memory_file).upsert_many({
+            topic: {
+                "summary": output["summary"],
+                "level": level,
+                "glossary": output["glossary"],
+                "timestamp": timestamp
+            }
+            for topic, output in outputs.items()
+        })
+
+def generate_digestible_output(topic, level="novice", memory_file=None, save=True):
+    """Research ``topic`` on Wikipedia and save the result to memory.
+
+    With ``save=False`` the output is only returned; the caller saves it
+    (hedged lookups do once Wikipedia has won the race).
+    """
+    import requests
     print(f"[📚] Generating summary for '{topic}' at level: {level}")
 
     # Set default memory file if none provided
     if memory_file is None:
         memory_file = Path("research_memory.json")
 
-    # Load existing memory (or create new)
-    if memory_file.exists():
-        with open(memory_file, "r", encoding="utf-8") as f:
-            memory = json.load(f)
-    else:
-        memory = {}
+    try:
+        extract = get_wikipedia_summary(topic)
+    except requests.RequestException as e:
+        print(f"[⚠️] Wikipedia request failed: {e}")
+        extract = "Failed to retrieve summary."
 
-    # Simulate summary (you can hook into real logic here)
-    summary = f"This is a skill-aware summary of '{topic}' for a {level} learner."
+    if extract in ("No summary found.", "Failed to retrieve summary."):
+        metrics.inc("wikipedia_lookups_total", result="missing" if extract == "No summary found." else "error")
+        return {"summary": "No summary found.", "glossary": [], "source": "wikipedia"}
+    metrics.inc("wikipedia_lookups_total", result="found")
 
-    glossary = []
-    if level == "novice":
-        glossary = ["fuel", "injection", "combustion"]  # Example glossary extraction
+    output = build_digestible_output(extract, level)
+    if save:
+        save_to_memory({topic: output}, level, memory_file)
+    return output
 
-    # Save to memory
-    memory[topic] = {
-        "summary": summary,
-        "level": level,
-        "glossary": glossary,
-        "timestamp": datetime.now().isoformat()
-    }
+async def generate_digestible_output_async(topic, level="novice", memory_file=None):
+    """Async variant of generate_digestible_output; the memory write runs off the event loop."""
+    import asyncio
+    print(f"[📚] Generating summary for '{topic}' at level: {level}")
 
-    with open(memory_file, "w", encoding="utf-8") as f:
-        json.dump(memory, f, indent=2)
+    if memory_file is None:
+        memory_file = Path("research_memory.json")
 
-    return {
-        "summary": summary,
-        "glossary": glossary,
-        "source": "wikipedia"
-    }
+    try:
+        extract = await get_wikipedia_summary_async(topic)
+    except Exception as e:
+        print(f"[⚠️] Wikipedia request failed: {e}")
+        extract = "Failed to retrieve summary."
+
+    if extract in ("No summary found.", "Failed to retrieve summary."):
+        metrics.inc("wikipedia_lookups_total", result="missing" if extract == "No summary found." else "error")
+        return {"summary": "No summary found.", "glossary": [], "source": "wikipedia"}
+    metrics.inc("wikipedia_lookups_total", result="found")
+
+    output = build_digestible_output(extract, level)
+    await asyncio.to_thread(save_to_memory, {topic: output}, level, memory_file)
+    return output
+
+def generate_digestible_outputs(topics, level="novice", memory_file=None, fallback=True):
+    """Batch variant of generate_digestible_output for bulk runs.
+
+    Returns {topic: output} in the same shape as generate_digestible_output.
+    Topics the batch query cannot resolve go through the single-title path
+    when ``fallback`` is set and are left out otherwise.
+    """
+    print(f"[📚] Generating summaries for {len(topics)} topics at level: {level}")
+
+    if memory_file is None:
+        memory_file = Path("research_memory.json")
+
+    extracts = get_wikipedia_summaries(topics)
+    outputs = {topic: build_digestible_output(extract, level) for topic, extract in extracts.items()}
+    if outputs:
+        save_to_memory(outputs, level, memory_file)
+
+    if fallback:
+        for topic in dict.fromkeys(topics):
+            if topic not in outputs:
+                outputs[topic] = generate_digestible_output(topic, level, memory_file)
+    return outputs
 
 
 def print_output(data: dict):
@@ -106,9 +275,22 @@ def print_output(data: dict):
             print(f"- {term}")
     print(f"\nNote: {data['note']}")
 
-if __name__ == "__main__":
+def as_topic_data(topic, level, output: dict, note=None) -> dict:
+    """Shape an output for print_output and the content generator."""
+    return {
+        "topic": topic,
+        "level": level,
+        "summary": output["summary"],
+        "glossary_terms": output.get("glossary", output.get("glossary_terms", [])),
+        "note": note or f"Source: {output.get('source', 'unknown')}. Tailored for {level}-level learners."
+    }
+
+def main():
     topic_input = input("Enter a topic to research: ")
     user_level = input("Enter your skill level (novice/intermediate/advanced): ").strip().lower()
     output = generate_digestible_output(topic_input, user_level)
     print("\n--- Research Agent Output ---")
-    print_output(output)
+    print_output(as_topic_data(topic_input, user_level, output))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# response_cache.py
+# Persistent HTTP response cache (SQLite) with TTL, LRU eviction and ETag revalidation
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import metrics
+
+CACHE_FILE = Path("http_cache.sqlite3")
+DEFAULT_TTL = 24 * 60 * 60  # seconds before an entry must be revalidated
+DEFAULT_MAX_ENTRIES = 5000
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def normalize_key(topic: str) -> str:
+    """Normalize a topic the way MediaWiki normalizes titles, so equivalent topics share an entry.
+
+    Underscores become spaces, whitespace is collapsed and the first character
+    is uppercased; the rest stays case-sensitive ("MIT" and "Mit" are different pages).
+    """
+    key = " ".join(topic.replace("_", " ").split())
+    return key[:1].upper() + key[1:]
+
+
+def conditional_headers(entry) -> dict:
+    """Build If-None-Match / If-Modified-Since headers for a cached entry."""
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of response bodies keyed by normalized topic."""
+
+    def __init__(self, path=CACHE_FILE, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.counters = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+            " stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        # Kept up to date by put/_evict so inserts never scan the table; only
+        # approximate if another process writes to the same file
+        (self._entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+
+    def get(self, key):
+        """Return the cached entry (with a ``fresh`` flag) or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                metrics.inc("cache_lookups_total", result="miss")
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            fresh = now - row[3] < self.ttl
+            self.counters["hits" if fresh else "stale"] += 1
+        metrics.inc("cache_lookups_total", result="hit" if fresh else "stale")
+        return {"body": row[0], "etag": row[1], "last_modified": row[2], "stored_at": row[3], "fresh": fresh}
+
+    def put(self, key, body, etag=None, last_modified=None):
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now, now),
+            )
+            self.counters["stores"] += 1
+            if exists is None:
+                self._entries += 1
+            self._evict()
+
+    def revalidated(self, key):
+        """Mark a stale entry as fresh again after a 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+            self.counters["revalidated"] += 1
+        metrics.inc("cache_lookups_total", result="revalidated")
+
+    def _evict(self):
+        excess = self._entries - self.max_entries
+        if excess > 0:
+            deleted = self._conn.execute(
+                "DELETE FROM responses WHERE key IN"
+                " (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+            self._entries -= deleted
+            self.counters["evictions"] += deleted
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._entries = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters, entries=self._entries, max_entries=self.max_entries, ttl=self.ttl)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def configure_cache(path=CACHE_FILE, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+    """Replace the shared cache instance (e.g. to point it at another file)."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = ResponseCache(path, ttl, max_entries)
+    return _cache
+
+
+def get_cache() -> ResponseCache:
+    """Return the shared cache, opening the default file on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,291 @@
+# run_log.py
+# Append-only JSON Lines log for autonomous runs, with segment rotation and a last-run index
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import status_snapshot
+from json_io import read_json, write_json_atomic
+
+LOG_DIR = Path("autonomous_logs")
+LEGACY_LOG_FILE = Path("autonomous_log.json")
+INDEX_NAME = "index.json"
+MAX_SEGMENT_BYTES = 5 * 1024 * 1024
+FSYNC_EVERY = 20  # entries written between fsyncs
+RUN_SUMMARY = "run_summary"  # value of "record" on the line each run writes when it closes
+
+_index_lock = threading.Lock()
+
+
+def _segments(log_dir):
+    return sorted(Path(log_dir).glob("*.jsonl"))
+
+
+def _new_index():
+    return {"total_entries": 0, "last_run": None, "segments": {}}
+
+
+def _import_legacy(log_dir, index):
+    """Copy the old single-file log into the first segment (caller holds _index_lock)."""
+    if not LEGACY_LOG_FILE.exists() or _segments(log_dir):
+        return
+    with open(LEGACY_LOG_FILE, "r", encoding="utf-8") as f:
+        legacy = json.load(f)
+    # The legacy history becomes the first (oldest) segment
+    segment = log_dir / "00000000-0000.jsonl"
+    with open(segment, "w", encoding="utf-8") as f:
+        for entry in legacy:
+            f.write(json.dumps(entry) + "\n")
+    index["total_entries"] = len(legacy)
+    index["segments"][segment.name] = len(legacy)
+
+
+def load_index(log_dir=LOG_DIR) -> dict:
+    """Read the compact index, creating it (and importing the legacy log) on first use."""
+    log_dir = Path(log_dir)
+    index_file = log_dir / INDEX_NAME
+    with _index_lock:
+        if index_file.exists():
+            with open(index_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        index = _new_index()
+        _import_legacy(log_dir, index)
+        write_json_atomic(index_file, index)
+        return index
+
+
+def _count_segment(segment) -> int:
+    return sum(1 for _ in _iter_segment(segment))
+
+
+def rebuild_index(log_dir=LOG_DIR) -> dict:
+    """Recount all segments, e.g. after a run was interrupted before closing its writer.
+
+    last_run comes from the newest run-summary record in the segments.
+    """
+    log_dir = Path(log_dir)
+    with _index_lock:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        _import_legacy(log_dir, _new_index())
+        previous = read_json(log_dir / INDEX_NAME, {}).get("last_run")
+    index = _new_index()
+    last = None
+    for segment in _segments(log_dir):
+        count = 0
+        for record in _iter_records(segment):
+            if _is_summary(record):
+                previous = _run_record(record)
+                continue
+            count += 1
+            last = record
+        index["segments"][segment.name] = count
+        index["total_entries"] += count
+    if previous and (last is None or last.get("run_id") == previous.get("run_id")):
+        index["last_run"] = previous
+    elif last is not None:
+        # The newest entries belong to a run that never closed its writer
+        index["last_run"] = {
+            "run_id": last.get("run_id"),
+            "finished": last.get("timestamp"),
+        }
+    with _index_lock:
+        write_json_atomic(log_dir / INDEX_NAME, index)
+    return index
+
+
+class RunLogWriter:
+    """Appends one JSON line per entry; rotates segments by size and by day.
+
+    Lines are flushed to the OS on every append and fsynced every
+    ``fsync_every`` entries and on close. close() appends a run-summary
+    record (kept out of iter_log) and updates the index.
+    """
+
+    def __init__(self, log_dir=LOG_DIR, run_id=None, max_segment_bytes=MAX_SEGMENT_BYTES,
+                 fsync_every=FSYNC_EVERY):
+        self.log_dir = Path(log_dir)
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync_every = max(1, fsync_every)
+        self.started = datetime.now().isoformat()
+        self.entries = 0
+        self.last_timestamp = None
+        self._pending_sync = 0
+        self._written = set()  # names of the segments this run appended to
+        self._file = None
+        self._segment = None
+        self._lock = threading.Lock()
+        self.closed = False
+        load_index(self.log_dir)
+
+    def _open_segment(self, now):
+        day = now.strftime("%Y%m%d")
+        existing = [p for p in _segments(self.log_dir) if p.name.startswith(day)]
+        segment = existing[-1] if existing else self.log_dir / f"{day}-0000.jsonl"
+        if segment.exists() and segment.stat().st_size >= self.max_segment_bytes:
+            seq = int(segment.stem.split("-")[1]) + 1
+            segment = self.log_dir / f"{day}-{seq:04d}.jsonl"
+        self._close_segment()
+        self._segment = segment
+        self._file = open(segment, "a", encoding="utf-8")
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            self._pending_sync = 0
+
+    def append(self, entry: dict):
+        now = datetime.now()
+        line = json.dumps(dict(entry, run_id=self.run_id)) + "\n"
+        with self._lock:
+            if (self._file is None
+                    or not self._segment.name.startswith(now.strftime("%Y%m%d"))
+                    or self._file.tell() >= self.max_segment_bytes):
+                self._open_segment(now)
+            self._file.write(line)
+            self._file.flush()
+            self.entries += 1
+            self.last_timestamp = entry.get("timestamp", self.last_timestamp)
+            self._written.add(self._segment.name)
+            self._pending_sync += 1
+            if self._pending_sync >= self.fsync_every:
+                os.fsync(self._file.fileno())
+                self._pending_sync = 0
+
+    def close(self, summary=None):
+        """Write this run's summary record, sync the segment and update the index."""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            run = {
+                "run_id": self.run_id,
+                "started": self.started,
+                "finished": datetime.now().isoformat(),
+                "entries": self.entries,
+            }
+            if summary is not None:
+                run["summary"] = summary
+            now = datetime.now()
+            if self._file is None or not self._segment.name.startswith(now.strftime("%Y%m%d")):
+                self._open_segment(now)
+            self._file.write(json.dumps(dict(run, record=RUN_SUMMARY)) + "\n")
+            self._written.add(self._segment.name)
+            self._close_segment()
+            with _index_lock:
+                index_file = self.log_dir / INDEX_NAME
+                with open(index_file, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                # Recount from disk rather than adding this run's entries, so a
+                # rebuild_index() while the run was open is not counted twice
+                for name in self._written:
+                    index["segments"][name] = _count_segment(self.log_dir / name)
+                index["total_entries"] = sum(index["segments"].values())
+                index["last_run"] = run
+                write_json_atomic(index_file, index)
+            self._written = set()
+            status_snapshot.record_run(index["total_entries"], self.last_timestamp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _is_summary(record) -> bool:
+    return record.get("record") == RUN_SUMMARY
+
+
+def _run_record(record) -> dict:
+    return {k: v for k, v in record.items() if k != "record"}
+
+
+def _iter_records(segment):
+    with open(segment, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from an interrupted write
+
+
+def _iter_segment(segment):
+    """Log entries of one segment, without the run-summary records."""
+    for record in _iter_records(segment):
+        if not _is_summary(record):
+            yield record
+
+
+def iter_log(log_dir=LOG_DIR):
+    """Yield every log entry, oldest first."""
+    load_index(log_dir)
+    for segment in _segments(log_dir):
+        yield from _iter_segment(segment)
+
+
+def read_log(log_dir=LOG_DIR) -> list:
+    """Compatibility view: the full history as the old list of dicts."""
+    return list(iter_log(log_dir))
+
+
+def iter_runs(log_dir=LOG_DIR):
+    """Yield the summary record of every completed run, oldest first."""
+    load_index(log_dir)
+    for segment in _segments(log_dir):
+        for record in _iter_records(segment):
+            if _is_summary(record):
+                yield _run_record(record)
+
+
+def tail(n=1, log_dir=LOG_DIR, block_size=8192) -> list:
+    """Return the last ``n`` entries by reading segments backwards from the end."""
+    if not Path(log_dir).exists():
+        return []
+    entries = []
+    for segment in reversed(_segments(log_dir)):
+        with open(segment, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            buffer = b""
+            while True:
+                while position > 0 and buffer.count(b"\n") <= n - len(entries):
+                    step = min(block_size, position)
+                    position -= step
+                    f.seek(position)
+                    buffer = f.read(step) + buffer
+                lines = buffer.splitlines()
+                # The first line may be partial; keep it for the next read
+                buffer = lines.pop(0) if position > 0 and lines else b""
+                for line in reversed(lines):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if _is_summary(entry):
+                        continue
+                    entries.append(entry)
+                    if len(entries) == n:
+                        return list(reversed(entries))
+                if position == 0:
+                    break
+    return list(reversed(entries))
+
+
+def last_run(log_dir=LOG_DIR):
+    """Return the summary record of the most recent completed run, or None."""
+    if not (Path(log_dir) / INDEX_NAME).exists() and not LEGACY_LOG_FILE.exists():
+        return None
+    return load_index(log_dir).get("last_run")
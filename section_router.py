@@ -0,0 +1,119 @@
+# section_router.py
+# Keyword-to-section routing compiled once into an Aho–Corasick automaton
+
+import json
+import threading
+from collections import deque
+from pathlib import Path
+
+RULES_FILE = Path(__file__).with_name("routing_rules.json")
+
+_router = None
+_router_lock = threading.Lock()
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every keyword occurrence."""
+
+    def __init__(self, patterns: dict):
+        # patterns: keyword -> payload. Node 0 is the root.
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for keyword, payload in patterns.items():
+            node = 0
+            for char in keyword:
+                nxt = self.goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][char] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = nxt
+            self.output[node].append((len(keyword), payload))
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text: str):
+        """Yield (start, end, payload) for every keyword occurrence in ``text``."""
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, payload in self.output[node]:
+                yield index - length + 1, index + 1, payload
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class SectionRouter:
+    """Routes a topic to every section whose keywords appear in it as whole words."""
+
+    def __init__(self, rules: dict):
+        self.default_section = rules.get("default_section", "general_insights")
+        self.level_sections = rules.get("level_sections", {})
+        self.section_order = {name: i for i, name in enumerate(rules.get("sections", {}))}
+        keywords = {}
+        for section, words in rules.get("sections", {}).items():
+            for word in words:
+                keywords.setdefault(word.lower(), []).append(section)
+        self.matcher = AhoCorasick(keywords)
+
+    @classmethod
+    def from_file(cls, path=RULES_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, text: str) -> list:
+        """Sections whose keywords occur in ``text`` (word-boundary matches only)."""
+        text = text.lower()
+        found = set()
+        for start, end, sections in self.matcher.find(text):
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if end < len(text) and _is_word_char(text[end]):
+                continue
+            found.update(sections)
+        return sorted(found, key=lambda s: self.section_order.get(s, len(self.section_order)))
+
+    def route(self, topic: str, level=None) -> list:
+        """Keyword sections plus any level sections; the default section if nothing applies."""
+        sections = self.match(topic)
+        for section in self.level_sections.get(level, []):
+            if section not in sections:
+                sections.append(section)
+        return sections or [self.default_section]
+
+
+def get_router() -> SectionRouter:
+    """Return the shared router, compiling the rules file on first use."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = SectionRouter.from_file(RULES_FILE)
+    return _router
+
+
+def reload_router(path=RULES_FILE) -> SectionRouter:
+    """Recompile the shared router after the rules file changed."""
+    global _router
+    with _router_lock:
+        _router = SectionRouter.from_file(path)
+    return _router
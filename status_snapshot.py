@@ -0,0 +1,172 @@
+# status_snapshot.py
+# Small status file kept current by the agents as they write, so /status never scans history
+
+import argparse
+import atexit
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from json_io import read_json, write_json_atomic
+
+STATUS_FILE = Path("status_snapshot.json")
+FLUSH_DELAY = 1.0  # seconds recorded changes wait so a burst of writes updates the file once
+
+_lock = threading.Lock()
+_cache = {"mtime": None, "data": None}
+_pending = {}  # status file -> {(section or None, key): value} not yet written
+_timer = None
+
+
+def _empty():
+    return {
+        "memory_entries": {},   # memory file name -> entry count
+        "inbox_items": {},      # inbox file name -> {level: item count}
+        "evaluated_topics": 0,  # total run-log entries
+        "last_run": None,       # timestamp of the newest run-log entry
+        "updated_at": None,
+    }
+
+
+def _file_key(path) -> str:
+    return Path(path).name
+
+
+def _read(status_file):
+    # Re-parse only when another writer (or process) replaced the file
+    try:
+        mtime = status_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _cache["mtime"] != mtime or _cache["data"] is None:
+        _cache["data"] = read_json(status_file, _empty())
+        _cache["mtime"] = mtime
+    return _cache["data"]
+
+
+def _write(data, status_file):
+    """Stamp and write the snapshot (caller holds _lock)."""
+    data["updated_at"] = datetime.now().isoformat()
+    # The snapshot can always be rebuilt from the source files, so skip the fsync
+    write_json_atomic(status_file, data, fsync=False)
+    _cache["data"] = data
+    _cache["mtime"] = status_file.stat().st_mtime_ns
+
+
+def _apply(data, changes) -> bool:
+    changed = False
+    for (section, key), value in changes.items():
+        target = data if section is None else data[section]
+        if target.get(key) != value:
+            target[key] = value
+            changed = True
+    return changed
+
+
+def flush():
+    """Write the recorded changes to their snapshot files.
+
+    A snapshot that does not exist yet is left alone: load() builds it from
+    the source files, which already hold these changes.
+    """
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        for status_file, changes in pending.items():
+            data = _read(status_file)
+            if data is None:
+                continue
+            data = dict(data, memory_entries=dict(data["memory_entries"]), inbox_items=dict(data["inbox_items"]))
+            if _apply(data, changes):
+                _write(data, status_file)
+
+
+def _flush_later():
+    global _timer
+    with _lock:
+        _timer = None
+    flush()
+
+
+def _record(status_file, section, key, value):
+    # Writers only note the new value; changes are written together FLUSH_DELAY
+    # seconds later, so a memory commit never rewrites the whole snapshot
+    global _timer
+    with _lock:
+        _pending.setdefault(Path(status_file), {})[(section, key)] = value
+        if _timer is None:
+            _timer = threading.Timer(FLUSH_DELAY, _flush_later)
+            _timer.daemon = True
+            _timer.start()
+
+
+def record_memory(memory_file, count, status_file=STATUS_FILE):
+    _record(status_file, "memory_entries", _file_key(memory_file), count)
+
+
+def inbox_counts(inbox: dict) -> dict:
+    digest = inbox.get("weekly_digest", {})
+    return {level: len(items) for level, items in digest.items() if isinstance(items, list)}
+
+
+def record_inbox(inbox_file, inbox: dict, status_file=STATUS_FILE):
+    _record(status_file, "inbox_items", _file_key(inbox_file), inbox_counts(inbox))
+
+
+def record_run(total_entries, last_timestamp=None, status_file=STATUS_FILE):
+    _record(status_file, None, "evaluated_topics", total_entries)
+    if last_timestamp:
+        _record(status_file, None, "last_run", last_timestamp)
+
+
+def rebuild(status_file=STATUS_FILE, log_dir=None) -> dict:
+    """Recompute the snapshot from the memory stores, inbox files and run log."""
+    import run_log
+    from memory_store import open_memory_store
+
+    status_file = Path(status_file)
+    with _lock:
+        _pending.pop(status_file, None)  # the source files are read below; later changes stay pending
+    log_dir = log_dir or run_log.LOG_DIR
+    data = _empty()
+
+    memory_files = {p.with_suffix(".json") for p in Path(".").glob("research_memory*.sqlite3")}
+    memory_files.update(Path(".").glob("research_memory*.json"))
+    for memory_file in sorted(memory_files):
+        data["memory_entries"][_file_key(memory_file)] = open_memory_store(memory_file).count()
+
+    for inbox_file in sorted(Path(".").glob("internal_inbox*.json")):
+        data["inbox_items"][_file_key(inbox_file)] = inbox_counts(read_json(inbox_file, {}))
+
+    index = run_log.rebuild_index(log_dir)
+    data["evaluated_topics"] = index["total_entries"]
+    last = run_log.tail(1, log_dir)
+    data["last_run"] = last[0].get("timestamp") if last else None
+
+    with _lock:
+        _write(data, status_file)
+    return data
+
+
+def load(status_file=STATUS_FILE) -> dict:
+    """Current snapshot; built from the source files the first time it is needed."""
+    status_file = Path(status_file)
+    flush()
+    with _lock:
+        data = _read(status_file)
+    if data is None:
+        return rebuild(status_file)
+    return data
+
+
+atexit.register(flush)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or rebuild the status snapshot.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Recompute the snapshot from memory, inbox and run-log files.")
+    args = parser.parse_args()
+    snapshot = rebuild() if args.rebuild else load()
+    print(json.dumps(snapshot, indent=2))
@@ -0,0 +1,143 @@
+# summarizer.py
+# Chunked map-reduce extractive summarization with memory bounded by chunk size
+
+import heapq
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+TARGET_CHARS = 1000  # length of the merged summary
+CHUNK_CHARS = 4000   # text scored at once; bounds memory regardless of document size
+CANDIDATES_PER_CHUNK = 8
+MAX_CANDIDATES = 64  # best sentences kept across all chunks during the reduce step
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+WORD = re.compile(r"[A-Za-z][A-Za-z\-']+")
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers him his how i if in into is it its itself just me more most my
+no nor not now of off on once only or other our out over own same she should so some such than
+that the their them then there these they this those through to too under until up very was we
+were what when where which while who whom why will with would you your
+""".split())
+
+
+def split_sentences(text: str) -> list:
+    return [s.strip() for s in SENTENCE_END.split(text) if s.strip()]
+
+
+def iter_chunks(source, chunk_chars=CHUNK_CHARS):
+    """Yield chunks of roughly ``chunk_chars`` cut at sentence boundaries.
+
+    ``source`` is a string or any iterable of strings (e.g. PDF pages), so a
+    document never has to be held in memory as a whole.
+    """
+    if isinstance(source, str):
+        source = [source]
+    buffer = ""
+    for part in source:
+        buffer += part
+        start = 0
+        while len(buffer) - start >= chunk_chars:
+            # Prefer cutting after the last sentence end inside the window
+            end = start + chunk_chars
+            cut = max(buffer.rfind(". ", start, end), buffer.rfind("! ", start, end),
+                      buffer.rfind("? ", start, end), buffer.rfind("\n", start, end))
+            if cut <= start:
+                cut = buffer.rfind(" ", start, end)  # no sentence end: at least keep words whole
+            cut = cut + 1 if cut > start else end
+            yield buffer[start:cut]
+            start = cut
+        buffer = buffer[start:]
+    if buffer.strip():
+        yield buffer
+
+
+def score_chunk(chunk_index: int, chunk: str, limit: int = CANDIDATES_PER_CHUNK) -> list:
+    """Map step: score sentences by normalized term frequency within the chunk.
+
+    Returns up to ``limit`` (score, chunk_index, sentence_index, sentence) tuples.
+    """
+    sentences = split_sentences(chunk)
+    words_per_sentence = [
+        [w for w in WORD.findall(s.lower()) if w not in STOPWORDS] for s in sentences
+    ]
+    frequencies = Counter(w for words in words_per_sentence for w in words)
+    if not frequencies:
+        return []
+    top = max(frequencies.values())
+    scored = []
+    for position, (sentence, words) in enumerate(zip(sentences, words_per_sentence)):
+        if not words:
+            continue
+        score = sum(frequencies[w] for w in words) / (top * len(words))
+        scored.append((score, chunk_index, position, sentence))
+    return heapq.nlargest(limit, scored)
+
+
+def _score_chunk_args(args):
+    return score_chunk(*args)
+
+
+def _map_chunks(chunks, workers):
+    if not workers or workers <= 1:
+        for index, chunk in enumerate(chunks):
+            yield score_chunk(index, chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a bounded number of chunks in flight so memory tracks chunk size
+        pending = []
+        for index, chunk in enumerate(chunks):
+            pending.append(pool.submit(_score_chunk_args, (index, chunk)))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def summarize_text(source, target_chars=TARGET_CHARS, chunk_chars=CHUNK_CHARS, workers=None) -> str:
+    """Extractive summary of ``source`` (string or iterable of strings).
+
+    Text shorter than ``target_chars`` is returned unchanged. Otherwise the
+    best-scoring sentences across all chunks are merged, in document order,
+    up to ``target_chars`` characters. ``workers`` > 1 scores chunks in
+    parallel processes.
+    """
+    if isinstance(source, str) and len(source) <= target_chars:
+        return source.strip()
+
+    # Remember the first chunk so short streamed input is passed through untouched
+    seen = {"chunks": 0, "first": ""}
+
+    def tracked(chunks):
+        for chunk in chunks:
+            if not seen["chunks"]:
+                seen["first"] = chunk
+            seen["chunks"] += 1
+            yield chunk
+
+    candidates = []  # min-heap of the best MAX_CANDIDATES sentences seen so far
+    for scored in _map_chunks(tracked(iter_chunks(source, chunk_chars)), workers):
+        for item in scored:
+            if len(candidates) < MAX_CANDIDATES:
+                heapq.heappush(candidates, item)
+            elif item > candidates[0]:
+                heapq.heapreplace(candidates, item)
+
+    if seen["chunks"] == 1 and len(seen["first"]) <= target_chars:
+        return seen["first"].strip()
+    if not candidates:
+        return ""
+
+    # Reduce step: take sentences by score until the target length, then restore order
+    chosen, length, picked = [], 0, set()
+    for score, chunk_index, position, sentence in sorted(candidates, reverse=True):
+        if sentence in picked or (length and length + len(sentence) + 1 > target_chars):
+            continue
+        picked.add(sentence)
+        chosen.append((chunk_index, position, sentence))
+        length += len(sentence) + 1
+    chosen.sort()
+    summary = " ".join(sentence for _, _, sentence in chosen)
+    return summary[:target_chars]
@@ -0,0 +1,327 @@
+# user_stores.py
+# Per-user in-process cache of memory and inbox stores for the API service
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+import metrics
+import status_snapshot
+from distribution_agent import DISTRIBUTION_LOCK, apply_distribution
+from json_io import read_json, write_json_atomic
+from memory_store import MemoryStore, close_memory_store, open_memory_store
+
+DEFAULT_MAX_USERS = 256
+DEFAULT_FLUSH_INTERVAL = 5.0  # seconds between background flushes of dirty stores
+SECTION_FILE = Path("section_outputs.json")
+
+_DELETED = object()
+
+
+def memory_file_for(user: str) -> Path:
+    return Path(f"research_memory__{user}.json")
+
+
+def inbox_file_for(user: str) -> Path:
+    return Path(f"internal_inbox__{user}.json")
+
+
+class CachedMemoryStore(MemoryStore):
+    """Write-behind layer over a MemoryStore.
+
+    Reads and writes go to an in-memory dict; dirty topics are written to the
+    backing store in one transaction by flush(). Queries that need the whole
+    store flush first and then delegate.
+    """
+
+    def __init__(self, backing: MemoryStore):
+        self.backing = backing
+        self._lock = threading.RLock()
+        self._cache = {}
+        self._dirty = {}
+
+    def get(self, topic, default=None):
+        with self._lock:
+            if topic not in self._cache:
+                self._cache[topic] = self.backing.get(topic, _DELETED)
+            record = self._cache[topic]
+        return default if record is _DELETED else record
+
+    def upsert_many(self, records: dict):
+        with self._lock:
+            self._cache.update(records)
+            self._dirty.update(records)
+
+    def delete(self, topic):
+        with self._lock:
+            self._cache[topic] = _DELETED
+            self._dirty[topic] = _DELETED
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            yield self
+
+    def items(self):
+        self.flush()
+        return self.backing.items()
+
+    def by_level(self, level):
+        self.flush()
+        return self.backing.by_level(level)
+
+    def since(self, timestamp):
+        self.flush()
+        return self.backing.since(timestamp)
+
+    def count(self) -> int:
+        self.flush()
+        return self.backing.count()
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            with self.backing.transaction():
+                upserts = {t: r for t, r in self._dirty.items() if r is not _DELETED}
+                if upserts:
+                    self.backing.upsert_many(upserts)
+                for topic, record in self._dirty.items():
+                    if record is _DELETED:
+                        self.backing.delete(topic)
+            self._dirty.clear()
+
+
+class CachedDocument:
+    """A JSON file held in memory. Writers hold ``lock`` and call mark_dirty()."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.RLock()
+        self.data = read_json(self.path, {})
+        self.dirty = False
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def flush(self):
+        with self.lock:
+            if self.dirty:
+                metrics.inc("bytes_written_total", write_json_atomic(self.path, self.data, fsync=False),
+                            target="user_inbox")
+                self.dirty = False
+
+
+class UserStore:
+    def __init__(self, user: str):
+        self.user = user
+        self.memory = CachedMemoryStore(open_memory_store(memory_file_for(user)))
+        self.inbox = CachedDocument(inbox_file_for(user))
+        self.active = 0  # requests currently using this store; busy stores are never evicted
+
+    @property
+    def dirty(self) -> bool:
+        return self.memory.dirty or self.inbox.dirty
+
+    def flush(self):
+        self.memory.flush()
+        with self.inbox.lock:
+            if self.inbox.dirty:
+                self.inbox.flush()
+                status_snapshot.record_inbox(self.inbox.path, self.inbox.data)
+
+    def close(self):
+        """Write out everything and release the backing store's connections."""
+        self.flush()
+        close_memory_store(memory_file_for(self.user))
+
+
+class UserStoreManager:
+    """LRU-bounded cache of per-user stores with per-user write locks and timed flushing."""
+
+    def __init__(self, max_users=DEFAULT_MAX_USERS, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 section_file=SECTION_FILE):
+        self.max_users = max_users
+        self.flush_interval = flush_interval
+        self.section_file = Path(section_file)
+        self._pending_sections = {}
+        self._sections_lock = threading.Lock()
+        self._users = OrderedDict()
+        self._busy = {}  # user -> Event set once their store has finished loading or closing
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "flushes": 0}
+        self.flush_seconds_last = 0.0
+        self.flush_seconds_max = 0.0
+        self.flush_seconds_total = 0.0
+
+    @contextmanager
+    def use(self, user: str):
+        """Check out a user's store for the duration of a request."""
+        store = self._checkout(user)
+        try:
+            yield store
+        finally:
+            self._checkin(store)
+
+    @asynccontextmanager
+    async def use_async(self, user: str):
+        """use() for async handlers: a cache miss opens the user's files on a worker thread."""
+        store = await asyncio.to_thread(self._checkout, user)
+        try:
+            yield store
+        finally:
+            self._checkin(store)
+
+    def _checkout(self, user):
+        # Opening a store (SQLite connect/migration, inbox read) and flushing
+        # evicted ones happen outside self._lock, so one slow user's files
+        # never stall requests for the others.
+        while True:
+            with self._lock:
+                store = self._users.get(user)
+                if store is not None:
+                    self.counters["hits"] += 1
+                    self._users.move_to_end(user)
+                    store.active += 1
+                    return store
+                busy = self._busy.get(user)
+                if busy is None:
+                    busy = self._busy[user] = threading.Event()
+                    break
+            # Another request is loading this user, or its evicted copy is still being written
+            busy.wait()
+        try:
+            store = UserStore(user)
+        except BaseException:
+            with self._lock:
+                del self._busy[user]
+            busy.set()
+            raise
+        with self._lock:
+            self.counters["misses"] += 1
+            store.active += 1
+            self._users[user] = store
+            del self._busy[user]
+            evicted = self._evict()
+        busy.set()
+        self._close_evicted(evicted)
+        return store
+
+    def _checkin(self, store):
+        with self._lock:
+            store.active -= 1
+
+    def _evict(self) -> list:
+        # Called with self._lock held; returns (user, store, event) for _close_evicted().
+        # Each evicted user stays marked busy until its files are written, so a
+        # re-load of the same user never reads them before the evicted copy is flushed.
+        evicted = []
+        for user in list(self._users):
+            if len(self._users) <= self.max_users:
+                break
+            store = self._users[user]
+            if store.active:
+                continue
+            del self._users[user]
+            busy = self._busy[user] = threading.Event()
+            evicted.append((user, store, busy))
+            self.counters["evictions"] += 1
+        return evicted
+
+    def _close_evicted(self, evicted):
+        for user, store, busy in evicted:
+            try:
+                store.close()
+            except Exception as e:
+                # The caller already holds its own store, so report rather than fail its request
+                print(f"[⚠️] Closing evicted store for {user} failed: {e}")
+            finally:
+                with self._lock:
+                    del self._busy[user]
+                busy.set()
+
+    def distribute(self, store: UserStore, topic, summary, level):
+        """Route one summary into the user's inbox (in memory) and the section buffer."""
+        section_updates = {}
+        with store.inbox.lock:
+            apply_distribution([(topic, summary, level)], section_updates, store.inbox.data)
+            store.inbox.mark_dirty()
+        with self._sections_lock:
+            for section, entries in section_updates.items():
+                self._pending_sections.setdefault(section, []).extend(entries)
+
+    def _flush_sections(self):
+        # The section file is shared with the autonomous pipeline, so buffered
+        # entries are merged into the file on disk rather than overwriting it.
+        with self._sections_lock:
+            pending, self._pending_sections = self._pending_sections, {}
+        if not pending:
+            return
+        with DISTRIBUTION_LOCK:
+            section_data = read_json(self.section_file, {})
+            for section, entries in pending.items():
+                section_data.setdefault(section, []).extend(entries)
+            metrics.inc("bytes_written_total", write_json_atomic(self.section_file, section_data, fsync=False),
+                        target="sections")
+
+    def flush_all(self):
+        started = time.perf_counter()
+        with self._lock:
+            stores = list(self._users.values())
+        for store in stores:
+            store.flush()
+        self._flush_sections()
+        elapsed = time.perf_counter() - started
+        self.counters["flushes"] += 1
+        self.flush_seconds_last = elapsed
+        self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+        self.flush_seconds_total += elapsed
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush_all()
+            except Exception as e:
+                print(f"[⚠️] Store flush failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._flush_loop, name="user-store-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the timer and write out everything still dirty."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush_all()
+
+    def stats(self) -> dict:
+        with self._lock:
+            cached = len(self._users)
+            dirty = sum(1 for store in self._users.values() if store.dirty)
+        with self._sections_lock:
+            pending_sections = sum(len(entries) for entries in self._pending_sections.values())
+        flushes = self.counters["flushes"]
+        return dict(
+            self.counters,
+            cached_users=cached,
+            max_users=self.max_users,
+            dirty_users=dirty,
+            pending_section_entries=pending_sections,
+            flush_interval=self.flush_interval,
+            flush_ms_last=round(self.flush_seconds_last * 1000, 3),
+            flush_ms_max=round(self.flush_seconds_max * 1000, 3),
+            flush_ms_avg=round(self.flush_seconds_total / flushes * 1000, 3) if flushes else 0.0,
+        )
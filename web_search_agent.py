@@ -1,41 +1,37 @@
 # web_search_agent.py
 # Performs a basic web search and extracts a skill-aware summary from result snippets
 
-import requests
-import json
+import os
 from urllib.parse import quote
 from pathlib import Path
-from bs4 import BeautifulSoup
 
+import ddg_extractor
+import http_client
+import metrics
+from memory_store import open_memory_store
+from summarizer import summarize_text
 from research_agent_stub import apply_skill_level_tone, extract_glossary_terms
 
 MEMORY_FILE = Path("research_memory.json")
-
-# Load or initialize memory
-if MEMORY_FILE.exists():
-    with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-        memory = json.load(f)
-else:
-    memory = {}
+# Base URL of the DuckDuckGo HTML endpoint (override to point at a local stub)
+DUCKDUCKGO_URL = os.environ.get("DUCKDUCKGO_URL", "https://html.duckduckgo.com").rstrip("/")
 
 def duckduckgo_search(query):
     try:
-        url = f"https://duckduckgo.com/html/?q={quote(query)}"
+        url = f"{DUCKDUCKGO_URL}/html/?q={quote(query)}"
         headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=headers, stream=True)
         if response.status_code == 200:
-            # Very basic extraction from raw HTML
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.text, "html.parser")
-            results = soup.select("a.result__snippet")
-            snippets = [res.get_text() for res in results[:5]]
+            # Stops reading the page once five snippets are parsed
+            snippets = ddg_extractor.extract_from_response(response, ddg_extractor.SNIPPET_CLASS, limit=5)
             return "\n".join(snippets)
+        response.close()
     except Exception as e:
         print(f"Search failed: {e}")
     return ""
 
 def summarize_web_results(text: str, topic: str, level: str):
-    short_text = text[:1000]  # Clip long results
+    short_text = summarize_text(text)  # Extractive summary of all snippets
     summary = apply_skill_level_tone(short_text, level)
     glossary = extract_glossary_terms(short_text) if level == "novice" else []
 
@@ -47,9 +43,7 @@ def summarize_web_results(text: str, topic: str, level: str):
         "note": f"Generated from live web search. Tailored for {level}-level learners."
     }
 
-    memory[topic] = output
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(memory, f, indent=2)
+    open_memory_store(MEMORY_FILE).upsert(topic, output)
 
     return output
 
@@ -62,7 +56,7 @@ def print_output(data: dict):
             print(f"- {term}")
     print(f"\nNote: {data['note']}")
 
-if __name__ == "__main__":
+def main():
     topic = input("Enter a topic to search the web for: ").strip()
     level = input("Enter your skill level (novice/intermediate/advanced): ").strip().lower()
 
@@ -71,45 +65,70 @@ if __name__ == "__main__":
 
     if not web_data:
         print("No results could be retrieved from the web.")
-        exit()
+        return
 
     result = summarize_web_results(web_data, topic, level)
     print("\n--- Web Search Agent Output ---")
     print_output(result)
 
-def web_search_summary(topic, level):
-    print(f"[🌐] Searching web for: {topic} (level: {level})")
-
-    # Query DuckDuckGo HTML page
-    headers = {"User-Agent": "Mozilla/5.0"}
-    query_url = f"https://html.duckduckgo.com/html/?q={topic.replace(' ', '+')}+explanation"
-
-    try:
-        response = requests.get(query_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Extract top result snippets
-        results = soup.find_all("a", class_="result__a", limit=3)
-        snippets = [result.get_text(strip=True) for result in results]
+if __name__ == "__main__":
+    main()
 
-        if not snippets:
-            return {"summary": "No useful web results found.", "source": "web_search"}
+WEB_HEADERS = {"User-Agent": "Mozilla/5.0"}
 
-        combined = " ".join(snippets)
+def web_search_summary(topic, level, cancel_event=None):
+    """Web search fallback; setting ``cancel_event`` stops reading the results page."""
+    print(f"[🌐] Searching web for: {topic} (level: {level})")
 
-        # Format based on skill level
-        if level == "novice":
-            summary = f"Beginner-friendly summary: {combined}"
-        elif level == "intermediate":
-            summary = f"Here’s what the web says: {combined}"
-        else:
-            summary = combined  # Leave unmodified for advanced
+    try:
+        with metrics.timer("web_search"):
+            response = http_client.get(_web_query_url(topic), headers=WEB_HEADERS, stream=True)
+            snippets = ddg_extractor.extract_from_response(response, limit=3, cancel_event=cancel_event)
+            if cancel_event is not None and cancel_event.is_set():
+                # Another source already answered; the partial read is not an empty result
+                metrics.inc("web_search_total", result="cancelled")
+                return {"summary": "", "source": "web_search"}
+            return _format_web_summary(snippets, level)
+    except Exception as e:
+        print(f"[⚠️] Web search failed: {e}")
+        metrics.inc("web_search_total", result="error")
+        return {"summary": "Search error occurred.", "source": "web_search"}
 
-        return {
-            "summary": summary,
-            "source": "web_search"
-        }
+async def web_search_summary_async(topic, level):
+    """Async variant of web_search_summary (non-blocking HTTP)."""
+    print(f"[🌐] Searching web for: {topic} (level: {level})")
 
+    try:
+        with metrics.timer("web_search"):
+            response = await http_client.aget(_web_query_url(topic), headers=WEB_HEADERS)
+            return _format_web_summary(ddg_extractor.extract(response.text, limit=3), level)
     except Exception as e:
         print(f"[⚠️] Web search failed: {e}")
+        metrics.inc("web_search_total", result="error")
         return {"summary": "Search error occurred.", "source": "web_search"}
+
+def _web_query_url(topic):
+    # Query DuckDuckGo HTML page
+    return f"{DUCKDUCKGO_URL}/html/?q={topic.replace(' ', '+')}+explanation"
+
+def _format_web_summary(snippets, level):
+    # snippets: top result titles from ddg_extractor
+    if not snippets:
+        metrics.inc("web_search_total", result="empty")
+        return {"summary": "No useful web results found.", "source": "web_search"}
+    metrics.inc("web_search_total", result="found")
+
+    combined = " ".join(snippets)
+
+    # Format based on skill level
+    if level == "novice":
+        summary = f"Beginner-friendly summary: {combined}"
+    elif level == "intermediate":
+        summary = f"Here’s what the web says: {combined}"
+    else:
+        summary = combined  # Leave unmodified for advanced
+
+    return {
+        "summary": summary,
+        "source": "web_search"
+    }